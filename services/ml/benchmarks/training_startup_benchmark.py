@@ -0,0 +1,90 @@
+"""
+Training Startup Benchmark
+
+Measures how long the churn training entry points take to start, in fresh
+interpreters, and checks that TensorFlow and tensorflowjs are not imported
+until the TF.js export stage needs them.
+
+Usage:
+    python training_startup_benchmark.py --repeats 10
+    python training_startup_benchmark.py --max-seconds 5.0   # exit 1 if slower (CI gate)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+TRAINING_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'training')
+
+HEAVY_MODULES = ['tensorflow', 'tensorflowjs']
+
+IMPORT_PROBE = (
+    "import json, sys; import ChurnModelTrainer; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+COMMANDS = {
+    'interpreter': [sys.executable, '-c', 'pass'],
+    'import_module': [sys.executable, '-c', 'import ChurnModelTrainer'],
+    'cli_help': [sys.executable, 'ChurnModelTrainer.py', '--help'],
+}
+
+
+def time_command(command: List[str], repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=TRAINING_DIR, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+
+    return {'best_seconds': min(timings), 'median_seconds': float(np.median(timings))}
+
+
+def heavy_modules_loaded() -> List[str]:
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE],
+        cwd=TRAINING_DIR, check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark churn trainer startup time')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='Fail if the median CLI --help time exceeds this')
+    args = parser.parse_args()
+
+    results = {name: time_command(command, args.repeats) for name, command in COMMANDS.items()}
+    results['heavy_modules_on_import'] = heavy_modules_loaded()
+
+    for name in COMMANDS:
+        logger.info(
+            f"{name:>14}: {results[name]['median_seconds'] * 1000:8.1f}ms median, "
+            f"{results[name]['best_seconds'] * 1000:8.1f}ms best"
+        )
+
+    if results['heavy_modules_on_import']:
+        logger.warning(f"Heavy modules imported at startup: {results['heavy_modules_on_import']}")
+
+    print(json.dumps(results, indent=2))
+
+    if args.max_seconds is not None and (
+        results['cli_help']['median_seconds'] > args.max_seconds or results['heavy_modules_on_import']
+    ):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Tree Method Benchmark
+
+Compares XGBoost tree methods, histogram bin counts and thread budgets for
+the churn model on a synthetic dataset (1M rows by default). Each
+configuration trains in a fresh process so peak memory is comparable.
+
+Usage:
+    python tree_method_benchmark.py
+    python tree_method_benchmark.py --rows 200000 --methods hist approx --max-bins 64 256 --threads 2 4
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'training'))
+
+from TrainingConfig import TrainingConfig, ResourceMonitor, available_cpus
+from SyntheticChurnData import SCHEMAS, generate_feature_matrix
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run_configuration(data_dir: str, config: Dict, n_estimators: int) -> Dict:
+    import xgboost as xgb
+    from sklearn.metrics import roc_auc_score
+
+    X_train = np.load(os.path.join(data_dir, 'X_train.npy'), mmap_mode='r')
+    y_train = np.load(os.path.join(data_dir, 'y_train.npy'))
+    X_test = np.load(os.path.join(data_dir, 'X_test.npy'))
+    y_test = np.load(os.path.join(data_dir, 'y_test.npy'))
+
+    training_config = TrainingConfig(**config)
+    model = xgb.XGBClassifier(
+        max_depth=6,
+        learning_rate=0.1,
+        n_estimators=n_estimators,
+        objective='binary:logistic',
+        random_state=42,
+        **training_config.xgb_params()
+    )
+
+    with ResourceMonitor() as monitor:
+        model.fit(X_train, y_train)
+
+    return {
+        **training_config.to_dict(),
+        **monitor.to_dict(),
+        'roc_auc': float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark XGBoost tree methods for the churn model')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--schema', choices=SCHEMAS, default='profile')
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--methods', nargs='+', default=['exact', 'approx', 'hist'])
+    parser.add_argument('--max-bins', nargs='+', type=int, default=[256])
+    parser.add_argument('--threads', nargs='+', type=int, default=[available_cpus()])
+    args = parser.parse_args()
+
+    logger.info(f"Generating {args.rows:,} row {args.schema} dataset...")
+    X, y = generate_feature_matrix(args.rows, args.schema)
+    split = int(len(X) * 0.8)
+
+    configurations = []
+    for method, n_threads in itertools.product(args.methods, args.threads):
+        # Bin count only matters for histogram-based methods
+        bins = args.max_bins if method in ('hist', 'approx') else [args.max_bins[0]]
+        configurations.extend(
+            {'tree_method': method, 'max_bin': max_bin, 'n_threads': n_threads} for max_bin in bins
+        )
+
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        np.save(os.path.join(data_dir, 'X_train.npy'), X[:split])
+        np.save(os.path.join(data_dir, 'y_train.npy'), y[:split])
+        np.save(os.path.join(data_dir, 'X_test.npy'), X[split:])
+        np.save(os.path.join(data_dir, 'y_test.npy'), y[split:])
+        del X, y
+
+        for config in configurations:
+            start = time.perf_counter()
+            # One process per configuration so peak RSS is not inherited
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(run_configuration, data_dir, config, args.n_estimators).result()
+            result['process_seconds'] = time.perf_counter() - start
+            results.append(result)
+
+            logger.info(
+                f"{result['tree_method']:>6} bins={result['max_bin']:<4} threads={result['n_threads']:<3}: "
+                f"{result['training_seconds']:7.1f}s train, peak RSS {result['peak_rss_mb']:7.0f} MB, "
+                f"AUC {result['roc_auc']:.4f}"
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+User Features Query Benchmark
+
+Compares the original fan-out JOIN + COUNT(DISTINCT) user features query
+against the pre-aggregated form used by DataPipeline.load_user_features.
+
+Without --database-url a local SQLite fixture is generated; with a PostgreSQL
+URL the existing tables are used and rows processed come from EXPLAIN ANALYZE.
+SQLite has no equivalent measurement, so rows processed are reported as n/a.
+
+Usage:
+    python user_features_query_benchmark.py --users 5000 --checkins 40 --goals 5 --sessions 30
+    python user_features_query_benchmark.py --database-url postgresql://localhost/upcoach
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'training'))
+
+from DataPipeline import DataPipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+FAN_OUT_QUERY = """
+SELECT
+  u.id as user_id,
+  u.created_at as user_created_at,
+  COUNT(DISTINCT hc.id) as total_checkins,
+  COUNT(DISTINCT g.id) as total_goals,
+  COUNT(DISTINCT us.id) as total_sessions,
+  u.subscription_tier
+FROM users u
+LEFT JOIN habit_checkins hc ON u.id = hc.user_id
+LEFT JOIN goals g ON u.id = g.user_id
+LEFT JOIN user_sessions us ON u.id = us.user_id
+WHERE 1=1
+GROUP BY u.id, u.created_at, u.subscription_tier
+"""
+
+
+def build_sqlite_fixture(path: str, n_users: int, checkins: int, goals: int, sessions: int, seed: int = 42):
+    """Create users and child tables with Poisson-distributed rows per user"""
+    rng = np.random.default_rng(seed)
+    engine = create_engine(f"sqlite:///{path}")
+
+    user_ids = [str(uuid.UUID(int=int(i) + 1)) for i in range(n_users)]
+    users = pd.DataFrame({
+        'id': user_ids,
+        'created_at': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n_users), unit='D'),
+        'subscription_tier': rng.choice(['free', 'pro', 'premium'], n_users),
+    })
+
+    def child_table(mean_per_user: int) -> pd.DataFrame:
+        counts = rng.poisson(mean_per_user, n_users)
+        return pd.DataFrame({
+            'id': np.arange(counts.sum()),
+            'user_id': np.repeat(user_ids, counts),
+        })
+
+    with engine.begin() as conn:
+        users.to_sql('users', conn, index=False)
+        child_table(checkins).to_sql('habit_checkins', conn, index=False)
+        child_table(goals).to_sql('goals', conn, index=False)
+        child_table(sessions).to_sql('user_sessions', conn, index=False)
+        for table in ('habit_checkins', 'goals', 'user_sessions'):
+            conn.execute(text(f"CREATE INDEX idx_{table}_user_id ON {table} (user_id)"))
+
+    return engine
+
+
+def explain_rows(engine, query: str) -> int:
+    """Total rows emitted by all plan nodes according to PostgreSQL EXPLAIN ANALYZE"""
+    with engine.connect() as conn:
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}")).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    def walk(node: Dict) -> int:
+        rows = node.get('Actual Rows', 0) * node.get('Actual Loops', 1)
+        return rows + sum(walk(child) for child in node.get('Plans', []))
+
+    return walk(plan[0]['Plan'])
+
+
+def time_query(engine, query: str, repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = pd.read_sql(text(query), engine)
+        timings.append(time.perf_counter() - start)
+
+    return {'rows_returned': len(df), 'best_seconds': min(timings), 'median_seconds': float(np.median(timings))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark user features query shapes')
+    parser.add_argument('--database-url', type=str, default=None,
+                        help='PostgreSQL URL; omit to use a generated SQLite fixture')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--checkins', type=int, default=40, help='Mean check-ins per user')
+    parser.add_argument('--goals', type=int, default=5, help='Mean goals per user')
+    parser.add_argument('--sessions', type=int, default=30, help='Mean sessions per user')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    pre_aggregated_query = DataPipeline.build_user_features_query()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.database_url:
+            engine = create_engine(args.database_url)
+            fan_out_rows = explain_rows(engine, FAN_OUT_QUERY)
+            pre_aggregated_rows = explain_rows(engine, pre_aggregated_query)
+        else:
+            logger.info(f"Building SQLite fixture with {args.users} users...")
+            engine = build_sqlite_fixture(
+                os.path.join(tmp_dir, 'fixture.db'),
+                args.users, args.checkins, args.goals, args.sessions
+            )
+            fan_out_rows = pre_aggregated_rows = None
+
+        results = {
+            'fan_out_join': dict(time_query(engine, FAN_OUT_QUERY, args.repeats), rows_processed=fan_out_rows),
+            'pre_aggregated': dict(time_query(engine, pre_aggregated_query, args.repeats), rows_processed=pre_aggregated_rows),
+        }
+        engine.dispose()
+
+    for name, result in results.items():
+        rows_processed = result['rows_processed']
+        logger.info(
+            f"{name:>15}: {result['best_seconds'] * 1000:9.1f}ms best, "
+            f"{'n/a' if rows_processed is None else f'{rows_processed:,}':>12} rows processed, "
+            f"{result['rows_returned']:,} rows returned"
+        )
+
+    speedup = results['fan_out_join']['best_seconds'] / max(results['pre_aggregated']['best_seconds'], 1e-9)
+    logger.info(f"Speedup: {speedup:.1f}x")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
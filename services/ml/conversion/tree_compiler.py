@@ -0,0 +1,350 @@
+"""
+Exact XGBoost Tree Compiler
+
+Compiles a trained XGBoost booster into a fixed-shape tensor program and
+exports it to TensorFlow.js, replacing neural-network approximations of the
+trees with the trees themselves.
+
+Every tree is padded to a complete binary tree of the ensemble's maximum
+depth (shallow leaves are replicated into their padded subtree), so all trees
+are evaluated together, one level at a time:
+
+    feature, threshold = gather(node)        # (batch, trees)
+    value = gather(x, feature)
+    node = 2 * node + 1 + go_right(value)    # missing values follow default_left
+
+and the leaf values reached are summed with the base margin. Only gather,
+compare and select ops are used, which the TF.js graph-model runtime supports.
+
+Usage:
+    python tree_compiler.py --input models/churn_model_20250126.json --output models/churn_model
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import logging
+from typing import Optional
+
+import numpy as np
+import xgboost as xgb
+
+# Training helpers used to build synthetic validation rows
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'training'))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SUPPORTED_OBJECTIVES = {
+    'binary:logistic': 'sigmoid',
+    'reg:logistic': 'sigmoid',
+    'binary:logitraw': 'identity',
+    'reg:squarederror': 'identity',
+}
+
+
+class CompiledForest:
+    """
+    Tree ensemble as dense per-level arrays
+
+    Attributes:
+        features:      (n_trees, 2 ** depth - 1) int32 split feature per internal node
+        thresholds:    (n_trees, 2 ** depth - 1) float32 split threshold (go left if x < threshold)
+        default_left:  (n_trees, 2 ** depth - 1) bool direction for missing values
+        leaf_values:   (n_trees, 2 ** depth) float32 leaf value per padded leaf
+        base_margin:   float32 margin added to the sum of leaf values
+        link:          'sigmoid' or 'identity'
+        n_iterations:  boosting rounds compiled
+    """
+
+    def __init__(self, features, thresholds, default_left, leaf_values, base_margin, link, n_features, n_iterations):
+        self.features = features
+        self.thresholds = thresholds
+        self.default_left = default_left
+        self.leaf_values = leaf_values
+        self.base_margin = np.float32(base_margin)
+        self.link = link
+        self.n_features = n_features
+        self.n_iterations = n_iterations
+
+    @property
+    def n_trees(self) -> int:
+        return self.features.shape[0]
+
+    @property
+    def depth(self) -> int:
+        return int(np.log2(self.leaf_values.shape[1]))
+
+    @classmethod
+    def from_booster(cls, booster: xgb.Booster, iteration_limit: Optional[int] = None) -> 'CompiledForest':
+        """
+        Compile a booster
+
+        Args:
+            booster: Trained booster with numerical splits and a single output
+            iteration_limit: Number of boosting rounds to keep; defaults to
+                best_iteration + 1 when the booster was early-stopped
+        """
+        model = json.loads(booster.save_raw(raw_format='json'))
+        learner = model['learner']
+
+        objective = learner['objective']['name']
+        if objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for tree compilation: {objective}")
+
+        learner_param = learner['learner_model_param']
+        if int(learner_param.get('num_class', 0)) > 1 or int(learner_param.get('num_target', 1)) > 1:
+            raise ValueError("Tree compilation supports single-output models only")
+
+        gbtree = learner['gradient_booster']
+        if gbtree['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster type for tree compilation: {gbtree['name']}")
+
+        if iteration_limit is None:
+            best_iteration = booster.attr('best_iteration')
+            if best_iteration is not None:
+                iteration_limit = int(best_iteration) + 1
+
+        iteration_indptr = gbtree['model'].get('iteration_indptr')
+        if iteration_indptr is None:
+            # Models saved before XGBoost 2.0 have a fixed number of trees per round
+            trees_per_round = int(gbtree['model']['gbtree_model_param'].get('num_parallel_tree', 1))
+            iteration_indptr = list(range(0, len(gbtree['model']['trees']) + 1, trees_per_round))
+        if iteration_limit is None:
+            iteration_limit = len(iteration_indptr) - 1
+        trees = gbtree['model']['trees'][:iteration_indptr[iteration_limit]]
+
+        base_score = float(learner_param['base_score'].strip('[]'))
+        link = SUPPORTED_OBJECTIVES[objective]
+        base_margin = np.log(base_score / (1.0 - base_score)) if link == 'sigmoid' else base_score
+
+        depths = [cls._tree_depth(tree) for tree in trees]
+        depth = max(max(depths, default=0), 1)
+        n_internal, n_leaves = 2 ** depth - 1, 2 ** depth
+
+        features = np.zeros((len(trees), n_internal), dtype=np.int32)
+        thresholds = np.full((len(trees), n_internal), np.inf, dtype=np.float32)
+        default_left = np.ones((len(trees), n_internal), dtype=bool)
+        leaf_values = np.zeros((len(trees), n_leaves), dtype=np.float32)
+
+        for t, tree in enumerate(trees):
+            if any(int(split_type) != 0 for split_type in tree['split_type']):
+                raise ValueError("Tree compilation does not support categorical splits")
+
+            left = tree['left_children']
+            right = tree['right_children']
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+
+            # (xgboost node, padded position, level)
+            stack = [(0, 0, 0)]
+            while stack:
+                node, position, level = stack.pop()
+
+                if left[node] == -1:
+                    # Leaf: fill every padded leaf below this position
+                    span = 2 ** (depth - level)
+                    first = (position + 1) * span - 1 - n_internal
+                    leaf_values[t, first:first + span] = conditions[node]
+                    continue
+
+                features[t, position] = tree['split_indices'][node]
+                thresholds[t, position] = conditions[node]
+                default_left[t, position] = bool(tree['default_left'][node])
+
+                stack.append((left[node], 2 * position + 1, level + 1))
+                stack.append((right[node], 2 * position + 2, level + 1))
+
+        forest = cls(
+            features, thresholds, default_left, leaf_values, base_margin, link,
+            n_features=int(learner_param['num_feature']),
+            n_iterations=iteration_limit
+        )
+
+        logger.info(f"Compiled {forest.n_trees} trees to depth {forest.depth}")
+        return forest
+
+    @staticmethod
+    def _tree_depth(tree) -> int:
+        left, right = tree['left_children'], tree['right_children']
+        depth = 0
+        stack = [(0, 0)]
+        while stack:
+            node, level = stack.pop()
+            if left[node] == -1:
+                depth = max(depth, level)
+            else:
+                stack.append((left[node], level + 1))
+                stack.append((right[node], level + 1))
+        return depth
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """NumPy reference of the tensor program"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+
+        x_flat = X.reshape(-1)
+        row_offset = (np.arange(n_rows, dtype=np.int64) * self.n_features)[:, None]
+        tree_internal = (np.arange(self.n_trees, dtype=np.int64) * self.features.shape[1])[None, :]
+
+        node = np.zeros((n_rows, self.n_trees), dtype=np.int64)
+        for _ in range(self.depth):
+            flat_node = tree_internal + node
+            feature = self.features.reshape(-1)[flat_node]
+            threshold = self.thresholds.reshape(-1)[flat_node]
+            default_left = self.default_left.reshape(-1)[flat_node]
+
+            value = x_flat[row_offset + feature]
+            go_left = np.where(np.isnan(value), default_left, value < threshold)
+            node = 2 * node + 2 - go_left
+
+        leaf = node - self.features.shape[1]
+        tree_leaf = (np.arange(self.n_trees, dtype=np.int64) * self.leaf_values.shape[1])[None, :]
+        values = self.leaf_values.reshape(-1)[tree_leaf + leaf]
+
+        return values.sum(axis=1, dtype=np.float32) + self.base_margin
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        margin = self.predict_margin(X)
+        if self.link == 'sigmoid':
+            return 1.0 / (1.0 + np.exp(-margin))
+        return margin
+
+    def to_tf_module(self):
+        """Build a tf.Module whose `predict` signature runs the tensor program"""
+        import tensorflow as tf
+
+        forest = self
+
+        class ForestModule(tf.Module):
+            def __init__(self):
+                super().__init__(name='xgboost_forest')
+                self.features = tf.constant(forest.features.reshape(-1), dtype=tf.int32)
+                self.thresholds = tf.constant(forest.thresholds.reshape(-1), dtype=tf.float32)
+                self.default_left = tf.constant(forest.default_left.reshape(-1), dtype=tf.bool)
+                self.leaf_values = tf.constant(forest.leaf_values.reshape(-1), dtype=tf.float32)
+
+            @tf.function(input_signature=[tf.TensorSpec([None, forest.n_features], tf.float32, name='features')])
+            def predict(self, x):
+                n_rows = tf.shape(x)[0]
+                n_internal = forest.features.shape[1]
+                n_leaves = forest.leaf_values.shape[1]
+
+                x_flat = tf.reshape(x, [-1])
+                row_offset = tf.expand_dims(tf.range(n_rows) * forest.n_features, 1)
+                tree_internal = tf.expand_dims(tf.range(forest.n_trees) * n_internal, 0)
+
+                node = tf.zeros([n_rows, forest.n_trees], dtype=tf.int32)
+                for _ in range(forest.depth):
+                    flat_node = tree_internal + node
+                    feature = tf.gather(self.features, flat_node)
+                    threshold = tf.gather(self.thresholds, flat_node)
+                    default_left = tf.gather(self.default_left, flat_node)
+
+                    value = tf.gather(x_flat, row_offset + feature)
+                    go_left = tf.where(tf.math.is_nan(value), default_left, value < threshold)
+                    node = 2 * node + 2 - tf.cast(go_left, tf.int32)
+
+                tree_leaf = tf.expand_dims(tf.range(forest.n_trees) * n_leaves, 0)
+                values = tf.gather(self.leaf_values, tree_leaf + node - n_internal)
+                margin = tf.reduce_sum(values, axis=1, keepdims=True) + forest.base_margin
+
+                if forest.link == 'sigmoid':
+                    return tf.sigmoid(margin)
+                return margin
+
+        return ForestModule()
+
+    def save_tfjs(self, output_dir: str):
+        """Export as a TF.js graph model (SavedModel -> tfjs converter)"""
+        import tensorflow as tf
+        import tensorflowjs as tfjs
+
+        module = self.to_tf_module()
+
+        with tempfile.TemporaryDirectory() as saved_model_dir:
+            tf.saved_model.save(module, saved_model_dir, signatures={'serving_default': module.predict})
+            tfjs.converters.convert_tf_saved_model(saved_model_dir, output_dir)
+
+        logger.info(f"Saved TensorFlow.js graph model to {output_dir}")
+
+
+def validate_compiled(forest: CompiledForest, booster: xgb.Booster, X: np.ndarray) -> float:
+    """Max absolute difference between compiled and booster predictions"""
+    expected = booster.predict(
+        xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=booster.feature_names),
+        output_margin=forest.link == 'identity',
+        iteration_range=(0, forest.n_iterations)
+    )
+    return float(np.max(np.abs(forest.predict(X) - expected))) if len(X) else 0.0
+
+
+def synthetic_validation_rows(booster: xgb.Booster, n_rows: int, schema: str) -> np.ndarray:
+    """
+    Synthetic churn rows in the booster's input layout
+
+    'profile' models (churn_model_trainer.py) also get the derived features,
+    in the booster's feature order; 'activity' models (ChurnModelTrainer.py)
+    are standardized with the scaler stored on the booster by save_model.
+    """
+    from SyntheticChurnData import generate_dataset
+
+    df = generate_dataset(n_rows, schema)
+
+    if schema == 'profile':
+        from churn_model_trainer import feature_matrix
+
+        if not booster.feature_names:
+            raise ValueError("Profile validation needs a booster saved with feature names (churn_model_trainer.py)")
+        return feature_matrix(df, booster.feature_names)
+
+    scaler = booster.attr('feature_scaler')
+    if scaler is None:
+        raise ValueError("Activity validation needs the feature_scaler attribute written by ChurnModelTrainer.save_model")
+    scaler = json.loads(scaler)
+
+    X = df[scaler['feature_names']].to_numpy(dtype=np.float32, copy=True)
+    X -= np.asarray(scaler['mean'], dtype=np.float32)
+    X /= np.asarray(scaler['scale'], dtype=np.float32)
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile an XGBoost model to an exact TF.js graph model')
+    parser.add_argument('--input', type=str, required=True, help='XGBoost model file (.json/.ubj)')
+    parser.add_argument('--output', type=str, required=True, help='Output directory for the TF.js model')
+    parser.add_argument('--validation-rows', type=int, default=10000,
+                        help='Random rows used to check compiled predictions against the booster')
+    parser.add_argument('--validation-schema', choices=['profile', 'activity'], default=None,
+                        help='Validate on synthetic churn rows of this schema instead of Gaussian noise')
+    args = parser.parse_args()
+
+    booster = xgb.Booster()
+    booster.load_model(args.input)
+
+    forest = CompiledForest.from_booster(booster)
+
+    rng = np.random.default_rng(42)
+    if args.validation_schema:
+        X = synthetic_validation_rows(booster, args.validation_rows, args.validation_schema)
+    else:
+        X = rng.standard_normal((args.validation_rows, forest.n_features)).astype(np.float32)
+
+    if X.shape[1] != forest.n_features:
+        raise ValueError(
+            f"Validation rows have {X.shape[1]} features but the model expects {forest.n_features}; "
+            f"check --validation-schema matches the model"
+        )
+
+    X[rng.random(X.shape) < 0.05] = np.nan
+    max_diff = validate_compiled(forest, booster, X)
+    logger.info(f"Max abs difference vs booster on {len(X)} rows: {max_diff:.3e}")
+
+    os.makedirs(args.output, exist_ok=True)
+    forest.save_tfjs(args.output)
+
+
+if __name__ == '__main__':
+    main()
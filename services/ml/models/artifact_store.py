@@ -0,0 +1,276 @@
+"""
+Model Artifact Store
+Phase 11 Week 1
+
+Versioned, content-addressed storage for trained habit success models
+
+Layout:
+    <root>/objects/<sha256>.ubj       booster in UBJSON, shared by identical models
+    <root>/versions/<version>.json    compact metadata for one published version
+    <root>/manifest.json              index used for latest/by-version lookup
+    <root>/.lock                      flock serializing publish and garbage collection
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .habit_success_predictor import HabitSuccessPredictor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+
+
+def feature_schema_hash(feature_names: Sequence[str]) -> str:
+    """Stable hash of the ordered feature list a model expects"""
+    return hashlib.sha256(json.dumps(list(feature_names)).encode('utf-8')).hexdigest()[:16]
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write to a temp file in the same directory and rename over the target"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelArtifactStore:
+    """
+    Publishes and loads versioned HabitSuccessPredictor artifacts
+
+    Versions are monotonically increasing integers, so several trainings on
+    the same day never overwrite each other. The manifest keeps a summary of
+    every version (artifact id, schema hash, headline metrics, training
+    duration) and is cached in memory until the file changes on disk.
+
+    Publishing and garbage collection hold an exclusive lock on <root>/.lock,
+    so concurrent writers (threads or processes) never reuse a version number
+    and GC never deletes an object a publish has not yet recorded.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, 'objects')
+        self.versions_dir = os.path.join(root_dir, 'versions')
+        self.manifest_path = os.path.join(root_dir, MANIFEST_FILE)
+        self.lock_path = os.path.join(root_dir, LOCK_FILE)
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+        self._manifest_cache: Optional[Dict] = None
+        self._manifest_stamp = None
+
+    def _read_manifest(self) -> Dict:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return {'latest': None, 'versions': {}}
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._manifest_cache is None or stamp != self._manifest_stamp:
+            with open(self.manifest_path, 'rb') as f:
+                self._manifest_cache = json.load(f)
+            self._manifest_stamp = stamp
+
+        return self._manifest_cache
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive lock for read-modify-write of the manifest and objects"""
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another writer may have changed the manifest within the stamp's resolution
+                self._manifest_cache = None
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_manifest(self, manifest: Dict):
+        _write_atomic(self.manifest_path, json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+        self._manifest_cache = None
+
+    def publish(self, predictor: HabitSuccessPredictor, tags: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Store a trained predictor as a new version
+
+        Args:
+            predictor: Trained HabitSuccessPredictor
+            tags: Optional free-form labels (e.g. training mode, data window)
+
+        Returns:
+            Manifest entry for the new version
+        """
+        if predictor.model is None:
+            raise ValueError("No model to save")
+
+        # Serialize booster as UBJSON and address it by content hash
+        with tempfile.TemporaryDirectory(dir=self.root_dir) as tmp_dir:
+            tmp_model = os.path.join(tmp_dir, 'model.ubj')
+            predictor.model.save_model(tmp_model)
+            with open(tmp_model, 'rb') as f:
+                model_bytes = f.read()
+
+        artifact_id = hashlib.sha256(model_bytes).hexdigest()
+        model_file = os.path.join('objects', f'{artifact_id}.ubj')
+        model_path = os.path.join(self.root_dir, model_file)
+
+        with self._lock():
+            if not os.path.exists(model_path):
+                _write_atomic(model_path, model_bytes)
+
+            manifest = self._read_manifest()
+            version = max((int(v) for v in manifest['versions']), default=0) + 1
+            metadata = predictor.model_metadata
+
+            entry = {
+                'version': version,
+                'artifact_id': artifact_id,
+                'model_file': model_file,
+                'metadata_file': os.path.join('versions', f'{version}.json'),
+                'created_at': datetime.now().isoformat(),
+                'trained_at': metadata.get('trained_at'),
+                'feature_schema_hash': feature_schema_hash(predictor.feature_names),
+                'metrics': {
+                    name: value for name, value in metadata.get('metrics', {}).items()
+                    if isinstance(value, (int, float))
+                },
+                'training_duration_seconds': metadata.get('training_duration_seconds'),
+                'size_bytes': len(model_bytes),
+                'tags': tags or {}
+            }
+
+            version_record = {
+                'feature_names': predictor.feature_names,
+                'metadata': metadata,
+                'manifest_entry': entry
+            }
+            _write_atomic(
+                os.path.join(self.root_dir, entry['metadata_file']),
+                json.dumps(version_record, separators=(',', ':'), default=str).encode('utf-8')
+            )
+
+            manifest = {
+                'latest': version,
+                'versions': dict(manifest['versions'], **{str(version): entry})
+            }
+            self._write_manifest(manifest)
+
+        logger.info(f"Published model version {version} (artifact {artifact_id[:12]})")
+
+        return entry
+
+    def latest(self) -> Optional[Dict]:
+        """Manifest entry of the most recently published version, if any"""
+        manifest = self._read_manifest()
+        if manifest['latest'] is None:
+            return None
+
+        return manifest['versions'][str(manifest['latest'])]
+
+    def get(self, version: int) -> Dict:
+        """Manifest entry for a specific version"""
+        manifest = self._read_manifest()
+        if str(version) not in manifest['versions']:
+            raise KeyError(f"Model version {version} not found")
+
+        return manifest['versions'][str(version)]
+
+    def list_versions(self) -> List[Dict]:
+        """All manifest entries, oldest first"""
+        manifest = self._read_manifest()
+        return [manifest['versions'][v] for v in sorted(manifest['versions'], key=int)]
+
+    def load(
+        self,
+        version: Optional[int] = None,
+        expected_features: Optional[Sequence[str]] = None
+    ) -> HabitSuccessPredictor:
+        """
+        Load a predictor by version (latest when omitted)
+
+        Args:
+            version: Version number to load
+            expected_features: If given, refuse models trained on a different feature schema
+
+        Returns:
+            HabitSuccessPredictor with booster and metadata restored
+        """
+        entry = self.get(version) if version is not None else self.latest()
+        if entry is None:
+            raise ValueError("No model versions published")
+
+        if expected_features is not None and feature_schema_hash(expected_features) != entry['feature_schema_hash']:
+            raise ValueError(
+                f"Model version {entry['version']} was trained on a different feature schema"
+            )
+
+        with open(os.path.join(self.root_dir, entry['metadata_file']), 'rb') as f:
+            version_record = json.load(f)
+
+        predictor = HabitSuccessPredictor()
+        predictor.load_booster(
+            os.path.join(self.root_dir, entry['model_file']),
+            version_record['feature_names'],
+            version_record['metadata']
+        )
+
+        return predictor
+
+    def garbage_collect(self, keep_last: int = 5, protected: Sequence[int] = ()) -> List[int]:
+        """
+        Drop old versions and any booster objects no longer referenced
+
+        Args:
+            keep_last: Number of most recent versions to retain
+            protected: Versions to retain regardless of age (e.g. the one serving traffic)
+
+        Returns:
+            List of removed version numbers
+        """
+        with self._lock():
+            manifest = self._read_manifest()
+            ordered = sorted((int(v) for v in manifest['versions']), reverse=True)
+            keep = set(ordered[:keep_last]) | ({int(v) for v in protected} & set(ordered))
+            removed = [v for v in ordered if v not in keep]
+
+            if not removed:
+                return []
+
+            remaining = {str(v): manifest['versions'][str(v)] for v in ordered if v in keep}
+            self._write_manifest({
+                'latest': manifest['latest'] if str(manifest['latest']) in remaining else max(keep, default=None),
+                'versions': remaining
+            })
+
+            for version in removed:
+                metadata_path = os.path.join(self.root_dir, manifest['versions'][str(version)]['metadata_file'])
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
+
+            referenced = {entry['artifact_id'] for entry in remaining.values()}
+            for filename in os.listdir(self.objects_dir):
+                if filename.startswith('.'):
+                    continue  # in-flight write from a concurrent publish
+                artifact_id, _ = os.path.splitext(filename)
+                if artifact_id not in referenced:
+                    os.remove(os.path.join(self.objects_dir, filename))
+
+        logger.info(f"Garbage collected {len(removed)} model versions")
+
+        return removed
@@ -0,0 +1,97 @@
+"""
+External-Memory Data Loading
+Phase 11 Week 1
+
+Streams habit feature batches from on-disk Parquet shards into XGBoost
+so models can be trained on histories that do not fit in memory
+"""
+
+import os
+import glob
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+
+def resolve_shards(shards: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Expand a directory, glob pattern or explicit list into sorted shard paths
+
+    Args:
+        shards: Directory of .parquet files, glob pattern, or list of paths
+
+    Returns:
+        Sorted list of Parquet file paths
+    """
+    if isinstance(shards, str):
+        if os.path.isdir(shards):
+            paths = glob.glob(os.path.join(shards, '*.parquet'))
+        else:
+            paths = glob.glob(shards)
+    else:
+        paths = list(shards)
+
+    if not paths:
+        raise ValueError(f"No Parquet shards found for {shards!r}")
+
+    return sorted(paths)
+
+
+class ParquetShardIter(xgb.DataIter):
+    """
+    XGBoost data iterator over Parquet shards
+
+    Each call to next() hands one record batch to XGBoost, which builds its
+    quantized pages in cache_prefix on disk. Only a single batch of
+    batch_rows rows is resident in memory at any time.
+    """
+
+    def __init__(
+        self,
+        shards: Union[str, Sequence[str]],
+        feature_names: List[str],
+        target_column: str = 'maintained',
+        batch_rows: int = 256_000,
+        cache_prefix: Optional[str] = None
+    ):
+        self.shard_paths = resolve_shards(shards)
+        self.feature_names = list(feature_names)
+        self.target_column = target_column
+        self.batch_rows = batch_rows
+        self._batches: Optional[Iterator] = None
+
+        if cache_prefix is not None:
+            os.makedirs(os.path.dirname(cache_prefix) or '.', exist_ok=True)
+
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _iter_batches(self) -> Iterator[pd.DataFrame]:
+        columns = self.feature_names + [self.target_column]
+        for path in self.shard_paths:
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=self.batch_rows, columns=columns):
+                yield batch.to_pandas()
+
+    def next(self, input_data) -> int:
+        """Feed the next batch to XGBoost; return 0 when all shards are consumed"""
+        if self._batches is None:
+            self._batches = self._iter_batches()
+
+        batch = next(self._batches, None)
+        if batch is None:
+            return 0
+
+        input_data(
+            data=batch[self.feature_names].to_numpy(dtype=np.float32),
+            label=batch[self.target_column].to_numpy(dtype=np.float32),
+            feature_names=self.feature_names
+        )
+
+        return 1
+
+    def reset(self):
+        """Rewind to the first shard"""
+        self._batches = None
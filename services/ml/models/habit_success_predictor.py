@@ -6,16 +6,37 @@ XGBoost-based binary classifier to predict habit maintenance vs. abandonment
 Predicts weekly success probability (0-100%) for each active habit
 """
 
+import os
+import time
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, log_loss
 import joblib
 import json
 
+from .external_memory import ParquetShardIter
+
+
+DEFAULT_MODEL_PARAMS = {
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'n_estimators': 100,
+    'objective': 'binary:logistic',
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 3,
+    'gamma': 0.1,
+    'reg_alpha': 0.01,
+    'reg_lambda': 1.0,
+    'scale_pos_weight': 1.0,
+    'random_state': 42,
+    'eval_metric': 'logloss'
+}
+
 
 class HabitSuccessPredictor:
     """
@@ -31,8 +52,14 @@ class HabitSuccessPredictor:
     - Social accountability metrics
     """
 
-    def __init__(self, model_path: Optional[str] = None):
-        """Initialize predictor with optional pre-trained model"""
+    def __init__(self, model_path: Optional[str] = None, params: Optional[Dict] = None):
+        """
+        Initialize predictor with optional pre-trained model
+
+        Args:
+            model_path: Path prefix of a saved model to load
+            params: XGBClassifier hyperparameters overriding DEFAULT_MODEL_PARAMS
+        """
         self.model = None
         self.feature_names = []
         self.model_metadata = {}
@@ -40,25 +67,15 @@ class HabitSuccessPredictor:
         if model_path:
             self.load_model(model_path)
         else:
-            self._initialize_new_model()
-
-    def _initialize_new_model(self):
-        """Initialize new XGBoost model with optimal hyperparameters"""
-        self.model = xgb.XGBClassifier(
-            max_depth=6,
-            learning_rate=0.1,
-            n_estimators=100,
-            objective='binary:logistic',
-            subsample=0.8,
-            colsample_bytree=0.8,
-            min_child_weight=3,
-            gamma=0.1,
-            reg_alpha=0.01,
-            reg_lambda=1.0,
-            scale_pos_weight=1.0,
-            random_state=42,
-            eval_metric='logloss'
-        )
+            self._initialize_new_model(params)
+
+    def _initialize_new_model(self, params: Optional[Dict] = None):
+        """Initialize new XGBoost model with optimal (or tuned) hyperparameters"""
+        model_params = dict(DEFAULT_MODEL_PARAMS)
+        if params:
+            model_params.update(params)
+
+        self.model = xgb.XGBClassifier(**model_params)
 
         self.feature_names = [
             'streak_length',
@@ -102,6 +119,8 @@ class HabitSuccessPredictor:
         Returns:
             Dictionary of evaluation metrics
         """
+        train_start = time.perf_counter()
+
         # Prepare features and target
         X = training_data[self.feature_names]
         y = training_data[target_column]
@@ -143,7 +162,166 @@ class HabitSuccessPredictor:
         self.model_metadata = {
             'trained_at': datetime.now().isoformat(),
             'metrics': metrics,
-            'feature_importance': self._get_feature_importance()
+            'feature_importance': self._get_feature_importance(),
+            'model_params': self._get_model_params(),
+            'training_duration_seconds': time.perf_counter() - train_start
+        }
+
+        return metrics
+
+    def train_external_memory(
+        self,
+        train_shards: Union[str, List[str]],
+        val_shards: Union[str, List[str]],
+        target_column: str = 'maintained',
+        cache_dir: str = './xgb_cache',
+        n_jobs: int = 4,
+        max_bin: int = 256,
+        batch_rows: int = 256_000,
+        early_stopping_rounds: int = 10
+    ) -> Dict[str, float]:
+        """
+        Train out-of-core from Parquet shards using XGBoost external memory
+
+        Args:
+            train_shards: Directory, glob or list of training Parquet shards
+            val_shards: Directory, glob or list of validation Parquet shards
+            target_column: Name of target variable (1=maintained, 0=abandoned)
+            cache_dir: Directory for XGBoost's on-disk page cache
+            n_jobs: Number of threads used for training
+            max_bin: Number of histogram bins per feature
+            batch_rows: Rows read from Parquet per iterator batch
+            early_stopping_rounds: Rounds without validation improvement before stopping
+
+        Returns:
+            Dictionary of validation metrics
+        """
+        train_start = time.perf_counter()
+
+        train_iter = ParquetShardIter(
+            train_shards, self.feature_names, target_column,
+            batch_rows=batch_rows, cache_prefix=os.path.join(cache_dir, 'train')
+        )
+        val_iter = ParquetShardIter(
+            val_shards, self.feature_names, target_column,
+            batch_rows=batch_rows, cache_prefix=os.path.join(cache_dir, 'val')
+        )
+        dtrain = xgb.DMatrix(train_iter)
+        dval = xgb.DMatrix(val_iter)
+
+        params = self.model.get_xgb_params()
+        params.update({
+            'tree_method': 'hist',
+            'max_bin': max_bin,
+            'n_jobs': n_jobs,
+            'eval_metric': ['auc', 'logloss']
+        })
+
+        evals_result = {}
+        booster = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=self.model.n_estimators,
+            evals=[(dval, 'validation')],
+            early_stopping_rounds=early_stopping_rounds,
+            evals_result=evals_result,
+            verbose_eval=False
+        )
+
+        # Hand the booster back to the sklearn wrapper so prediction APIs keep working
+        self.model.load_model(bytearray(booster.save_raw(raw_format='json')))
+
+        best = booster.best_iteration
+        metrics = {
+            'roc_auc': evals_result['validation']['auc'][best],
+            'logloss': evals_result['validation']['logloss'][best],
+            'best_iteration': best,
+            'training_samples': dtrain.num_row(),
+            'validation_samples': dval.num_row(),
+            'training_shards': len(train_iter.shard_paths)
+        }
+
+        self.model_metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'metrics': metrics,
+            'feature_importance': self._get_feature_importance(),
+            'model_params': self._get_model_params(),
+            'training_duration_seconds': time.perf_counter() - train_start
+        }
+
+        return metrics
+
+    def continue_training(
+        self,
+        training_data: pd.DataFrame,
+        target_column: str = 'maintained',
+        additional_rounds: int = 25,
+        validation_split: float = 0.2,
+        early_stopping_rounds: int = 10
+    ) -> Dict[str, float]:
+        """
+        Continue boosting the current model on a new window of data
+
+        Args:
+            training_data: DataFrame with features and target for the new window only
+            target_column: Name of target variable (1=maintained, 0=abandoned)
+            additional_rounds: Number of trees to add on top of the existing model
+            validation_split: Proportion of the window held out to compare against the previous model
+            early_stopping_rounds: Stop adding trees once validation logloss has not improved for this many rounds
+
+        Returns:
+            Dictionary of validation metrics for the continued and the previous model
+        """
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+
+        train_start = time.perf_counter()
+
+        X = training_data[self.feature_names]
+        y = training_data[target_column]
+
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=validation_split, random_state=42, stratify=y
+        )
+
+        # Baseline: previous model on the same validation window
+        baseline_proba = self.model.predict_proba(X_val)[:, 1]
+        previous_booster = self.model.get_booster()
+        previous_trained_at = self.model_metadata.get('trained_at')
+
+        params = dict(self.model_metadata.get('model_params') or DEFAULT_MODEL_PARAMS)
+        params['n_estimators'] = additional_rounds
+        self.model = xgb.XGBClassifier(**params, early_stopping_rounds=early_stopping_rounds)
+
+        self.model.fit(
+            X_train, y_train,
+            eval_set=[(X_val, y_val)],
+            xgb_model=previous_booster,
+            verbose=False
+        )
+
+        y_pred_proba = self.model.predict_proba(X_val)[:, 1]
+
+        metrics = {
+            'accuracy': accuracy_score(y_val, y_pred_proba >= 0.5),
+            'roc_auc': roc_auc_score(y_val, y_pred_proba),
+            'log_loss': log_loss(y_val, y_pred_proba),
+            'baseline_roc_auc': roc_auc_score(y_val, baseline_proba),
+            'baseline_log_loss': log_loss(y_val, baseline_proba),
+            'additional_rounds': additional_rounds,
+            'total_rounds': self.model.get_booster().num_boosted_rounds(),
+            'best_iteration': self.model.best_iteration,
+            'training_samples': len(X_train),
+            'validation_samples': len(X_val)
+        }
+
+        self.model_metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'warm_started_from': previous_trained_at,
+            'metrics': metrics,
+            'feature_importance': self._get_feature_importance(),
+            'model_params': self._get_model_params(),
+            'training_duration_seconds': time.perf_counter() - train_start
         }
 
         return metrics
@@ -182,6 +360,15 @@ class HabitSuccessPredictor:
 
         return success_probs.tolist()
 
+    def predict_frame(self, features_df: pd.DataFrame) -> np.ndarray:
+        """Predict success probabilities for a DataFrame of feature rows without per-row dicts"""
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+
+        feature_matrix = features_df[self.feature_names].to_numpy(dtype=np.float32)
+
+        return self.model.predict_proba(feature_matrix)[:, 1]
+
     def get_risk_category(self, success_probability: float) -> str:
         """
         Categorize habit based on success probability
@@ -210,6 +397,12 @@ class HabitSuccessPredictor:
             for feature, score in zip(self.feature_names, importance_scores)
         }
 
+    def _get_model_params(self) -> Dict:
+        """Hyperparameters needed to rebuild the classifier, e.g. for warm-start continuation"""
+        params = self.model.get_params()
+        names = list(DEFAULT_MODEL_PARAMS) + ['tree_method', 'max_bin']
+        return {name: params[name] for name in names if params.get(name) is not None}
+
     def get_top_features(self, n: int = 5) -> List[Tuple[str, float]]:
         """Get top N most important features"""
         importance = self._get_feature_importance()
@@ -241,16 +434,19 @@ class HabitSuccessPredictor:
 
     def load_model(self, path: str):
         """Load model and metadata from disk"""
-        # Load XGBoost model
-        self.model = xgb.XGBClassifier()
-        self.model.load_model(f"{path}.xgb")
-
         # Load metadata
         with open(f"{path}_metadata.json", 'r') as f:
             metadata = json.load(f)
 
-        self.feature_names = metadata['feature_names']
-        self.model_metadata = metadata['metadata']
+        self.load_booster(f"{path}.xgb", metadata['feature_names'], metadata['metadata'])
+
+    def load_booster(self, model_file: str, feature_names: List[str], model_metadata: Dict):
+        """Load an XGBoost model file (.xgb, .json or .ubj) with already-parsed metadata"""
+        self.model = xgb.XGBClassifier()
+        self.model.load_model(model_file)
+
+        self.feature_names = feature_names
+        self.model_metadata = model_metadata
 
     def explain_prediction(
         self,
@@ -0,0 +1,292 @@
+"""
+Hyperparameter Search for Habit Success Models
+Phase 11 Week 1
+
+Parallel successive-halving search over XGBoost configurations
+Each worker process builds the quantized training matrix once and reuses it
+for every trial it runs; poor configurations are pruned early on validation logloss
+"""
+
+import os
+import time
+import tempfile
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import xgboost as xgb
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SEARCH_SPACE = {
+    'max_depth': [4, 5, 6, 8],
+    'learning_rate': [0.03, 0.05, 0.1, 0.2],
+    'subsample': [0.7, 0.8, 0.9, 1.0],
+    'colsample_bytree': [0.6, 0.8, 1.0],
+    'min_child_weight': [1, 3, 5, 10],
+    'gamma': [0.0, 0.1, 0.3],
+    'reg_alpha': [0.0, 0.01, 0.1],
+    'reg_lambda': [0.5, 1.0, 2.0],
+}
+
+# Per-process state populated by _init_worker
+_worker_dtrain = None
+_worker_dval = None
+
+
+def sample_configurations(
+    search_space: Dict[str, List],
+    n_trials: int,
+    seed: int = 42
+) -> List[Dict]:
+    """
+    Draw random configurations from a discrete search space
+
+    Args:
+        search_space: Mapping of parameter name to candidate values
+        n_trials: Number of configurations to draw
+        seed: Random seed for reproducibility
+
+    Returns:
+        List of parameter dictionaries (duplicates removed)
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    seen = set()
+
+    for _ in range(n_trials * 10):
+        config = {
+            name: values[rng.integers(len(values))]
+            for name, values in search_space.items()
+        }
+        key = tuple(sorted(config.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        configs.append(config)
+        if len(configs) == n_trials:
+            break
+
+    return configs
+
+
+def _init_worker(data_dir: str, max_bin: int, n_jobs: int):
+    """Build the quantized train/validation matrices once per worker process"""
+    global _worker_dtrain, _worker_dval
+
+    X_train = np.load(os.path.join(data_dir, 'X_train.npy'), mmap_mode='r')
+    y_train = np.load(os.path.join(data_dir, 'y_train.npy'), mmap_mode='r')
+    X_val = np.load(os.path.join(data_dir, 'X_val.npy'), mmap_mode='r')
+    y_val = np.load(os.path.join(data_dir, 'y_val.npy'), mmap_mode='r')
+
+    _worker_dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=max_bin, nthread=n_jobs)
+    _worker_dval = xgb.QuantileDMatrix(X_val, y_val, ref=_worker_dtrain, max_bin=max_bin, nthread=n_jobs)
+
+
+def _run_trial(
+    trial_id: int,
+    params: Dict,
+    num_rounds: int,
+    previous_model: Optional[bytearray] = None
+) -> Dict:
+    """Boost num_rounds more rounds for one configuration and report validation logloss"""
+    start = time.perf_counter()
+
+    xgb_model = None
+    if previous_model is not None:
+        xgb_model = xgb.Booster()
+        xgb_model.load_model(previous_model)
+
+    evals_result = {}
+    booster = xgb.train(
+        params,
+        _worker_dtrain,
+        num_boost_round=num_rounds,
+        evals=[(_worker_dval, 'validation')],
+        evals_result=evals_result,
+        xgb_model=xgb_model,
+        verbose_eval=False
+    )
+
+    return {
+        'trial_id': trial_id,
+        'logloss': float(evals_result['validation']['logloss'][-1]),
+        'wall_time_seconds': time.perf_counter() - start,
+        'model': booster.save_raw(raw_format='ubj')
+    }
+
+
+class HyperparameterSearch:
+    """
+    Successive-halving hyperparameter search over a process pool
+
+    All configurations start with min_rounds boosting rounds; after each rung
+    only the best 1/reduction_factor (by validation logloss) survive and
+    continue boosting from where they stopped, with the round budget
+    multiplied by reduction_factor, until max_rounds is reached.
+    """
+
+    def __init__(
+        self,
+        base_params: Optional[Dict] = None,
+        search_space: Optional[Dict[str, List]] = None,
+        n_trials: int = 27,
+        max_workers: int = 4,
+        n_jobs_per_trial: int = 2,
+        min_rounds: int = 25,
+        max_rounds: int = 400,
+        reduction_factor: int = 3,
+        max_bin: int = 256,
+        seed: int = 42
+    ):
+        self.base_params = base_params or {
+            'objective': 'binary:logistic',
+            'random_state': 42,
+        }
+        self.search_space = search_space or DEFAULT_SEARCH_SPACE
+        self.n_trials = n_trials
+        self.max_workers = max_workers
+        self.n_jobs_per_trial = n_jobs_per_trial
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.reduction_factor = reduction_factor
+        self.max_bin = max_bin
+        self.seed = seed
+
+    def _histogram_params(self) -> Dict:
+        """Tree construction settings shared by the trials and the final fit"""
+        return {'tree_method': 'hist', 'max_bin': self.max_bin}
+
+    def _trial_params(self, config: Dict) -> Dict:
+        params = dict(self.base_params)
+        params.update(config)
+        params.update(self._histogram_params())
+        params.update({
+            'n_jobs': self.n_jobs_per_trial,
+            'eval_metric': 'logloss',
+        })
+        # Trials boost through xgb.train, where the round count is
+        # num_boost_round; n_estimators is only meaningful to XGBClassifier
+        params.pop('n_estimators', None)
+        return params
+
+    def run(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray
+    ) -> Dict:
+        """
+        Run the search
+
+        Args:
+            X_train: Training features
+            y_train: Training labels
+            X_val: Validation features used for pruning
+            y_val: Validation labels
+
+        Returns:
+            Dictionary with best_params (XGBClassifier keyword arguments),
+            best_logloss, per-trial records and total wall time
+        """
+        search_start = time.perf_counter()
+        configs = sample_configurations(self.search_space, self.n_trials, self.seed)
+
+        trials = {
+            trial_id: {
+                'trial_id': trial_id,
+                'params': config,
+                'rounds': 0,
+                'logloss': None,
+                'wall_time_seconds': 0.0,
+                'pruned_at_rung': None,
+            }
+            for trial_id, config in enumerate(configs)
+        }
+        models: Dict[int, bytearray] = {}
+
+        logger.info(
+            f"Searching {len(configs)} configurations with {self.max_workers} workers "
+            f"x {self.n_jobs_per_trial} threads"
+        )
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            # Workers memory-map these instead of receiving pickled copies
+            np.save(os.path.join(data_dir, 'X_train.npy'), np.ascontiguousarray(X_train, dtype=np.float32))
+            np.save(os.path.join(data_dir, 'y_train.npy'), np.asarray(y_train, dtype=np.float32))
+            np.save(os.path.join(data_dir, 'X_val.npy'), np.ascontiguousarray(X_val, dtype=np.float32))
+            np.save(os.path.join(data_dir, 'y_val.npy'), np.asarray(y_val, dtype=np.float32))
+
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(data_dir, self.max_bin, self.n_jobs_per_trial)
+            ) as executor:
+                survivors = list(trials.keys())
+                budget = self.min_rounds
+                rung = 0
+
+                while survivors:
+                    extra_rounds = budget - trials[survivors[0]]['rounds']
+                    futures = [
+                        executor.submit(
+                            _run_trial,
+                            trial_id,
+                            self._trial_params(trials[trial_id]['params']),
+                            extra_rounds,
+                            models.get(trial_id)
+                        )
+                        for trial_id in survivors
+                    ]
+
+                    for future in futures:
+                        result = future.result()
+                        trial = trials[result['trial_id']]
+                        trial['rounds'] = budget
+                        trial['logloss'] = result['logloss']
+                        trial['wall_time_seconds'] += result['wall_time_seconds']
+                        models[result['trial_id']] = result['model']
+
+                    survivors.sort(key=lambda trial_id: trials[trial_id]['logloss'])
+                    best_logloss = trials[survivors[0]]['logloss']
+                    logger.info(
+                        f"Rung {rung}: {len(survivors)} trials at {budget} rounds, "
+                        f"best logloss {best_logloss:.4f}"
+                    )
+
+                    if budget >= self.max_rounds or len(survivors) == 1:
+                        break
+
+                    keep = max(1, len(survivors) // self.reduction_factor)
+                    for trial_id in survivors[keep:]:
+                        trials[trial_id]['pruned_at_rung'] = rung
+                        models.pop(trial_id, None)
+                    survivors = survivors[:keep]
+
+                    budget = min(self.max_rounds, budget * self.reduction_factor)
+                    rung += 1
+
+        best = trials[survivors[0]]
+        best_params = dict(self.base_params)
+        best_params.update(best['params'])
+        best_params.update(self._histogram_params())
+        best_params['n_estimators'] = best['rounds']
+
+        wall_time = time.perf_counter() - search_start
+        logger.info(
+            f"Best trial {best['trial_id']}: logloss {best['logloss']:.4f} "
+            f"after {best['rounds']} rounds ({wall_time:.1f}s total)"
+        )
+
+        return {
+            'best_params': best_params,
+            'best_logloss': best['logloss'],
+            'trials': sorted(trials.values(), key=lambda t: t['trial_id']),
+            'wall_time_seconds': wall_time,
+        }
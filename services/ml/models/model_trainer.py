@@ -5,11 +5,16 @@ Phase 11 Week 1
 Handles training, evaluation, and retraining of habit success models
 """
 
+import time
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 import logging
-from .habit_success_predictor import HabitSuccessPredictor
+from sklearn.model_selection import train_test_split
+from .habit_success_predictor import HabitSuccessPredictor, DEFAULT_MODEL_PARAMS
+from .hyperparameter_search import HyperparameterSearch
+from .streaming_metrics import StreamingBinaryMetrics
+from .artifact_store import ModelArtifactStore
 from .feature_engineering import prepare_training_dataset
 
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +28,15 @@ class ModelTrainer:
 
     def __init__(self, model_output_path: str = "models/production"):
         self.output_path = model_output_path
+        self.artifact_store = ModelArtifactStore(model_output_path)
         self.predictor = None
 
     def train_from_data(
         self,
         habits_history: List[Dict],
         user_profiles: Dict[str, Dict],
-        validation_split: float = 0.2
+        validation_split: float = 0.2,
+        params: Optional[Dict] = None
     ) -> Dict[str, float]:
         """
         Train model from raw data
@@ -38,6 +45,7 @@ class ModelTrainer:
             habits_history: Historical habit records
             user_profiles: User profile data
             validation_split: Proportion for validation
+            params: Optional hyperparameters, e.g. best_params from tune_hyperparameters
 
         Returns:
             Training metrics
@@ -51,7 +59,7 @@ class ModelTrainer:
         logger.info(f"Positive class ratio: {training_df['maintained'].mean():.2%}")
 
         # Initialize predictor
-        self.predictor = HabitSuccessPredictor()
+        self.predictor = HabitSuccessPredictor(params=params)
 
         # Train model
         logger.info("Training XGBoost model...")
@@ -68,20 +76,255 @@ class ModelTrainer:
 
         return metrics
 
-    def save_model(self):
-        """Save trained model to disk"""
+    def tune_hyperparameters(
+        self,
+        habits_history: List[Dict],
+        user_profiles: Dict[str, Dict],
+        validation_split: float = 0.2,
+        n_trials: int = 27,
+        max_workers: int = 4,
+        n_jobs_per_trial: int = 2
+    ) -> Dict:
+        """
+        Search hyperparameters with parallel successive halving
+
+        Args:
+            habits_history: Historical habit records
+            user_profiles: User profile data
+            validation_split: Proportion held out for pruning decisions
+            n_trials: Number of configurations to evaluate
+            max_workers: Number of worker processes
+            n_jobs_per_trial: XGBoost threads per worker
+
+        Returns:
+            Search result; pass result['best_params'] to train_from_data
+        """
+        training_df = prepare_training_dataset(habits_history, user_profiles)
+        feature_names = HabitSuccessPredictor().feature_names
+
+        X_train, X_val, y_train, y_val = train_test_split(
+            training_df[feature_names].to_numpy(dtype='float32'),
+            training_df['maintained'].to_numpy(),
+            test_size=validation_split,
+            random_state=42,
+            stratify=training_df['maintained']
+        )
+
+        search = HyperparameterSearch(
+            base_params=dict(DEFAULT_MODEL_PARAMS),
+            n_trials=n_trials,
+            max_workers=max_workers,
+            n_jobs_per_trial=n_jobs_per_trial
+        )
+        result = search.run(X_train, y_train, X_val, y_val)
+
+        logger.info(f"Best validation logloss: {result['best_logloss']:.4f}")
+        logger.info(f"Best parameters: {result['best_params']}")
+        for trial in result['trials']:
+            logger.info(
+                f"Trial {trial['trial_id']}: logloss={trial['logloss']:.4f} "
+                f"rounds={trial['rounds']} time={trial['wall_time_seconds']:.2f}s"
+            )
+
+        return result
+
+    def train_from_shards(
+        self,
+        train_shards: Union[str, List[str]],
+        val_shards: Union[str, List[str]],
+        n_jobs: int = 4,
+        cache_dir: str = './xgb_cache'
+    ) -> Dict[str, float]:
+        """
+        Train model out-of-core from pre-engineered Parquet feature shards
+
+        Args:
+            train_shards: Directory, glob or list of training shards
+            val_shards: Directory, glob or list of validation shards
+            n_jobs: Thread budget for XGBoost
+            cache_dir: Directory for XGBoost's external-memory cache
+
+        Returns:
+            Validation metrics
+        """
+        self.predictor = HabitSuccessPredictor()
+
+        logger.info(f"Training XGBoost model from Parquet shards with {n_jobs} threads...")
+        metrics = self.predictor.train_external_memory(
+            train_shards,
+            val_shards,
+            target_column='maintained',
+            cache_dir=cache_dir,
+            n_jobs=n_jobs
+        )
+
+        logger.info("Training complete!")
+        logger.info(f"Samples: {metrics['training_samples']}")
+        logger.info(f"ROC-AUC: {metrics['roc_auc']:.3f}")
+        logger.info(f"Log loss: {metrics['logloss']:.4f}")
+
+        return metrics
+
+    def retrain_incremental(
+        self,
+        new_habits: List[Dict],
+        user_profiles: Dict[str, Dict],
+        full_history: Optional[List[Dict]] = None,
+        additional_rounds: int = 25,
+        validation_split: float = 0.2,
+        max_auc_drop: float = 0.01
+    ) -> Dict[str, float]:
+        """
+        Warm-start retraining: continue boosting the latest saved model on new data only
+
+        Falls back to full retraining on full_history when the continued model's
+        validation ROC-AUC drops more than max_auc_drop below the previous model's
+        on the same window. Without full_history the previous model is kept.
+
+        Args:
+            new_habits: Habit records from the new window since the last training
+            user_profiles: User profile data
+            full_history: Complete history used only for the fallback
+            additional_rounds: Trees to add on top of the previous model
+            validation_split: Proportion of the new window held out for the guard
+            max_auc_drop: Allowed ROC-AUC degradation before falling back
+
+        Returns:
+            Metrics of the model in use, with 'mode' set to 'incremental', 'full' or
+            'kept_previous'; when the previous model is kept these are its stored
+            metrics and the rejected candidate's are under 'candidate_metrics'
+        """
+        latest = self.artifact_store.latest()
+        if latest is None:
+            logger.info("No saved model found, running full training")
+            metrics = self.train_from_data(full_history or new_habits, user_profiles, validation_split)
+            metrics['mode'] = 'full'
+            return metrics
+
+        logger.info(f"Warm-starting from model version {latest['version']} on {len(new_habits)} new habits...")
+
+        window_df = prepare_training_dataset(new_habits, user_profiles)
+        self.predictor = self.artifact_store.load(latest['version'])
+        previous_model = self.predictor.model
+        previous_metadata = self.predictor.model_metadata
+
+        metrics = self.predictor.continue_training(
+            window_df,
+            target_column='maintained',
+            additional_rounds=additional_rounds,
+            validation_split=validation_split
+        )
+
+        auc_drop = metrics['baseline_roc_auc'] - metrics['roc_auc']
+        logger.info(f"ROC-AUC: {metrics['baseline_roc_auc']:.3f} -> {metrics['roc_auc']:.3f}")
+
+        if auc_drop <= max_auc_drop:
+            metrics['mode'] = 'incremental'
+            return metrics
+
+        logger.warning(f"Validation ROC-AUC degraded by {auc_drop:.3f} after warm start")
+
+        if full_history is not None:
+            logger.info("Falling back to full retraining...")
+            metrics = self.train_from_data(full_history, user_profiles, validation_split)
+            metrics['mode'] = 'full'
+            return metrics
+
+        logger.warning("No full history provided, keeping previous model")
+        self.predictor.model = previous_model
+        self.predictor.model_metadata = previous_metadata
+
+        kept_metrics = dict(previous_metadata.get('metrics') or {})
+        kept_metrics['candidate_metrics'] = metrics
+        kept_metrics['mode'] = 'kept_previous'
+
+        return kept_metrics
+
+    def save_model(self, tags: Optional[Dict[str, str]] = None) -> Dict:
+        """Publish trained model as a new version in the artifact store"""
         if self.predictor is None:
             raise ValueError("No model to save")
 
-        model_path = f"{self.output_path}/habit_success_model_{datetime.now().strftime('%Y%m%d')}"
-        self.predictor.save_model(model_path)
+        entry = self.artifact_store.publish(self.predictor, tags=tags)
 
-        logger.info(f"Model saved to {model_path}")
+        logger.info(f"Model version {entry['version']} saved to {self.output_path}/{entry['model_file']}")
 
-    def evaluate_model(self, test_data: pd.DataFrame) -> Dict[str, float]:
-        """Evaluate model on test set"""
+        return entry
+
+    def evaluate_model(
+        self,
+        test_data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        target_column: str = 'maintained',
+        chunk_size: int = 100_000,
+        segment_columns: Sequence[str] = ('habit_category_encoded', 'time_of_day_encoded'),
+        threshold: float = 0.5
+    ) -> Dict[str, float]:
+        """
+        Evaluate model on a test set in chunks with streaming metrics
+
+        Args:
+            test_data: Test DataFrame, or an iterable of DataFrame chunks for holdouts too large to load
+            target_column: Name of target variable
+            chunk_size: Rows scored per batch when test_data is a single DataFrame
+            segment_columns: Columns to report per-value metrics for
+            threshold: Probability cut-off for the confusion matrix
+
+        Returns:
+            Overall metrics plus 'segments' and throughput figures
+        """
         if self.predictor is None:
             raise ValueError("No model to evaluate")
 
-        # Implement evaluation logic
-        pass
+        if isinstance(test_data, pd.DataFrame):
+            chunks = (
+                test_data.iloc[start:start + chunk_size]
+                for start in range(0, len(test_data), chunk_size)
+            )
+        else:
+            chunks = test_data
+
+        overall = StreamingBinaryMetrics(threshold=threshold)
+        segments = {column: {} for column in segment_columns}
+        scoring_seconds = 0.0
+        start_time = time.perf_counter()
+
+        for chunk in chunks:
+            y_true = chunk[target_column].to_numpy()
+
+            score_start = time.perf_counter()
+            y_score = self.predictor.predict_frame(chunk)
+            scoring_seconds += time.perf_counter() - score_start
+
+            overall.update(y_true, y_score)
+
+            for column in segment_columns:
+                if column not in chunk.columns:
+                    continue
+                values, inverse = np.unique(chunk[column].to_numpy(), return_inverse=True)
+                for index, value in enumerate(values):
+                    mask = inverse == index
+                    accumulator = segments[column].setdefault(
+                        value, StreamingBinaryMetrics(threshold=threshold)
+                    )
+                    accumulator.update(y_true[mask], y_score[mask])
+
+        elapsed = time.perf_counter() - start_time
+        metrics = overall.compute()
+        metrics['segments'] = {
+            column: {
+                str(value): accumulator.compute()
+                for value, accumulator in sorted(by_value.items())
+            }
+            for column, by_value in segments.items()
+        }
+        metrics['elapsed_seconds'] = elapsed
+        metrics['rows_per_second'] = metrics['samples'] / max(elapsed, 1e-9)
+        metrics['scoring_rows_per_second'] = metrics['samples'] / max(scoring_seconds, 1e-9)
+
+        logger.info(f"Evaluated {metrics['samples']} samples in {elapsed:.2f}s "
+                    f"({metrics['rows_per_second']:.0f} rows/s)")
+        logger.info(f"Accuracy: {metrics['accuracy']:.3f}")
+        logger.info(f"ROC-AUC: {metrics['roc_auc']:.3f}")
+        logger.info(f"Log loss: {metrics['log_loss']:.4f}")
+
+        return metrics
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# models/ is imported as a package, training/ modules use flat imports
+sys.path.insert(0, ML_DIR)
+sys.path.insert(0, os.path.join(ML_DIR, 'training'))
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+
+from models.artifact_store import ModelArtifactStore
+from models.habit_success_predictor import HabitSuccessPredictor
+
+
+def make_predictor(seed: int) -> HabitSuccessPredictor:
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((200, 3))
+    y = (X[:, 0] + rng.standard_normal(200) > 0).astype(int)
+
+    predictor = HabitSuccessPredictor()
+    predictor.model = xgb.XGBClassifier(n_estimators=3, max_depth=2, random_state=seed).fit(X, y)
+    predictor.feature_names = ['a', 'b', 'c']
+    predictor.model_metadata = {'metrics': {'roc_auc': 0.5}}
+    return predictor
+
+
+def test_concurrent_publishes_get_distinct_versions(tmp_path):
+    predictors = [make_predictor(seed) for seed in range(16)]
+
+    # One store instance per writer, as separate training processes would have
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        entries = list(executor.map(
+            lambda predictor: ModelArtifactStore(str(tmp_path)).publish(predictor), predictors
+        ))
+
+    assert sorted(entry['version'] for entry in entries) == list(range(1, 17))
+
+    store = ModelArtifactStore(str(tmp_path))
+    assert [entry['version'] for entry in store.list_versions()] == list(range(1, 17))
+    assert store.latest()['version'] == 16
+
+
+def test_garbage_collect_during_publishes_keeps_referenced_objects(tmp_path):
+    predictors = [make_predictor(seed) for seed in range(12)]
+
+    def publish_or_collect(i):
+        store = ModelArtifactStore(str(tmp_path))
+        if i % 3 == 0:
+            store.garbage_collect(keep_last=2)
+        return store.publish(predictors[i])
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(publish_or_collect, range(len(predictors))))
+
+    store = ModelArtifactStore(str(tmp_path))
+    for entry in store.list_versions():
+        assert os.path.exists(os.path.join(str(tmp_path), entry['model_file']))
+        store.load(entry['version'])
@@ -0,0 +1,34 @@
+import xgboost as xgb
+
+from ChurnModelTrainer import ChurnModelTrainer
+from SyntheticChurnData import generate_feature_matrix
+
+
+def test_cross_validation_cuts_come_from_training_rows_only(monkeypatch):
+    X, y = generate_feature_matrix(3000, 'activity')
+    built = []
+
+    class RecordingQuantileDMatrix(xgb.QuantileDMatrix):
+        def __init__(self, data, *args, ref=None, **kwargs):
+            built.append((len(data), ref))
+            super().__init__(data, *args, ref=ref, **kwargs)
+
+    monkeypatch.setattr(xgb, 'QuantileDMatrix', RecordingQuantileDMatrix)
+
+    trainer = ChurnModelTrainer('sqlite://')
+    trainer.cross_validate(X, y, cv=3, params={'max_depth': 3, 'objective': 'binary:logistic'},
+                           num_boost_round=10, early_stopping_rounds=3)
+
+    cut_sources = [rows for rows, ref in built if ref is None]
+    assert len(cut_sources) == 3
+    assert all(rows == 2000 for rows in cut_sources)
+
+
+def test_cross_validation_with_non_default_max_bin():
+    X, y = generate_feature_matrix(2000, 'activity')
+
+    trainer = ChurnModelTrainer('sqlite://')
+    scores = trainer.cross_validate(X, y, cv=3, params={'max_depth': 3, 'objective': 'binary:logistic'},
+                                    num_boost_round=10, early_stopping_rounds=3, max_bin=32)
+
+    assert len(scores) == 3
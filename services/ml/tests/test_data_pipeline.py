@@ -0,0 +1,242 @@
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+
+from DataPipeline import DataPipeline
+
+
+@pytest.fixture
+def pipeline():
+    return DataPipeline('sqlite://')
+
+
+@pytest.mark.parametrize('method', ['zscore', 'mad', 'iqr'])
+def test_zero_inflated_column_is_not_collapsed_to_the_median(pipeline, method):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        # 90% zeros, so MAD and IQR are both 0
+        'checkins': np.where(rng.random(1000) < 0.9, 0, rng.poisson(3, 1000) + 1),
+        'minutes': rng.normal(30, 5, 1000),
+    })
+    df.loc[0, 'minutes'] = 500
+
+    bounds = pipeline.compute_outlier_bounds(df, ['checkins', 'minutes'], method=method)
+    if method != 'zscore':
+        assert bounds['checkins'] == (-np.inf, np.inf)
+
+    clean = pipeline.remove_outliers(df, ['checkins', 'minutes'], method=method)
+    assert 0 not in clean.index
+    assert len(clean) >= 950
+
+    streamed = pd.concat(pipeline.remove_outliers_stream((df.iloc[i:i + 250] for i in range(0, 1000, 250)), bounds))
+    assert len(streamed) == len(clean)
+
+
+def test_constant_column_keeps_every_row(pipeline):
+    df = pd.DataFrame({'flag': np.zeros(100)})
+    bounds = pipeline.compute_outlier_bounds(df, ['flag'], method='mad')
+
+    assert bounds['flag'] == (-np.inf, np.inf)
+    assert pipeline.outlier_mask(df, bounds).all()
+
+
+def test_replace_keeps_indexes_and_dependent_views(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    pipeline.save_processed_data(pd.DataFrame({'user_id': [1, 2], 'score': [0.1, 0.2]}), 'scores')
+
+    with pipeline.engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX scores_user_id ON scores (user_id)"))
+        conn.execute(text("CREATE VIEW high_scores AS SELECT * FROM scores WHERE score > 0.5"))
+
+    pipeline.save_processed_data(pd.DataFrame({'score': [0.9, 0.3, 0.7], 'user_id': [3, 4, 5]}), 'scores')
+
+    indexes = [index['name'] for index in inspect(pipeline.engine).get_indexes('scores')]
+    assert 'scores_user_id' in indexes
+    assert sorted(pd.read_sql('SELECT user_id FROM high_scores', pipeline.engine)['user_id']) == [3, 5]
+    assert len(pd.read_sql('SELECT * FROM scores', pipeline.engine)) == 3
+
+
+def test_replace_with_new_columns_recreates_table(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    pipeline.save_processed_data(pd.DataFrame({'a': [1]}), 't')
+    pipeline.save_processed_data(pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}), 't')
+
+    assert list(pd.read_sql('SELECT * FROM t', pipeline.engine).columns) == ['a', 'b']
+
+
+def test_copy_buffer_distinguishes_empty_strings_from_nulls():
+    pipeline = DataPipeline('sqlite://')
+    df = pd.DataFrame({'note': ['', None, 'a,b'], 'value': [1.5, np.nan, 2.0]})
+
+    copy_sql = pipeline._copy_sql('notes', df.columns)
+    rows = list(csv.reader(pipeline._copy_buffer(df)))
+
+    assert copy_sql.endswith("WITH (FORMAT csv, NULL '\\N')")
+    # With NULL '\N', COPY reads only \N as NULL and an empty field as an empty string
+    assert rows[0] == ['', '1.5']
+    assert rows[1] == ['\\N', '\\N']
+    assert rows[2] == ['a,b', '2.0']
+
+
+def test_streamed_chunks_share_one_schema(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    df = pd.DataFrame({
+        # Small values in the first chunk, larger ones later
+        'checkins': np.r_[np.zeros(100, dtype=np.int64), np.arange(100) * 1000],
+        'rate': np.linspace(0, 1, 200),
+    })
+    pipeline.save_processed_data(df, 'activity')
+
+    chunks = list(pipeline.stream_from_query('SELECT * FROM activity ORDER BY rowid', chunksize=100))
+
+    assert [chunk['checkins'].dtype for chunk in chunks] == [pd.Int64Dtype(), pd.Int64Dtype()]
+    assert [chunk['rate'].dtype for chunk in chunks] == [np.float32, np.float32]
+    assert chunks[1]['checkins'].max() == 99000
+
+    paths = pipeline.spill_to_parquet(chunks, str(tmp_path / 'shards'))
+    schemas = {str(pd.read_parquet(path).dtypes.to_dict()) for path in paths}
+    assert len(schemas) == 1
+
+
+def test_nulls_and_large_values_in_later_chunks_do_not_abort_the_stream(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    with pipeline.engine.begin() as conn:
+        conn.execute(text('CREATE TABLE counts (n INTEGER, score REAL)'))
+        conn.execute(text(
+            'INSERT INTO counts VALUES (1, NULL), (2, NULL), (NULL, 0.5), (1099511627776, 1.5), (3, NULL)'
+        ))
+
+    chunks = list(pipeline.stream_from_query('SELECT n, score FROM counts ORDER BY rowid', chunksize=2))
+
+    assert [chunk['n'].dtype for chunk in chunks] == [pd.Int64Dtype()] * 3
+    assert chunks[1]['n'].isna().iloc[0] and chunks[1]['n'].iloc[1] == 2 ** 40
+    assert [chunk['score'].dtype for chunk in chunks] == [np.float64] * 3
+
+    paths = pipeline.spill_to_parquet(chunks, str(tmp_path / 'shards'))
+    combined = pd.read_parquet(str(tmp_path / 'shards'))
+    assert len(paths) == 3 and len(combined) == 5
+    assert combined['n'].dtype == pd.Int64Dtype() and combined['score'].dtype == np.float64
+
+
+def test_explicit_narrow_dtype_is_widened_instead_of_failing(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    pipeline.save_processed_data(pd.DataFrame({'n': [1, 2, 2 ** 40, 3]}), 'counts')
+
+    chunks = list(pipeline.stream_from_query(
+        'SELECT n FROM counts ORDER BY rowid', chunksize=2, dtypes={'n': np.dtype(np.int32)}
+    ))
+
+    assert chunks[0]['n'].dtype == np.int32
+    assert chunks[1]['n'].dtype == pd.Int64Dtype()
+    assert chunks[1]['n'].iloc[0] == 2 ** 40
+
+
+@pytest.mark.parametrize('dates', [[], [pd.NaT, pd.NaT]])
+def test_time_splits_reject_frames_without_dates(pipeline, dates):
+    df = pd.DataFrame({'created_at': pd.to_datetime(pd.Series(dates, dtype=object)), 'x': range(len(dates))})
+
+    with pytest.raises(ValueError, match='No rows with a created_at'):
+        pipeline.create_time_based_splits(df, 'created_at')
+    with pytest.raises(ValueError, match='No rows with a created_at'):
+        next(pipeline.walk_forward_splits(df, 'created_at'))
+
+
+def test_time_splits_put_undated_rows_in_test(pipeline):
+    created_at = pd.Series(pd.date_range('2024-01-01', periods=100, freq='D'))
+    created_at[[3, 50]] = pd.NaT
+    df = pd.DataFrame({'created_at': created_at, 'x': range(100)})
+
+    indices = pipeline.create_time_based_splits(df, 'created_at', return_indices=True)
+
+    assert sorted(np.concatenate(list(indices.values()))) == list(range(100))
+    assert {3, 50} <= set(indices['test'])
+
+
+def test_load_many_inside_event_loop_points_to_async_api(pipeline):
+    import asyncio
+
+    async def handler():
+        return pipeline.load_many({'one': ('SELECT 1 AS x', None)})
+
+    with pytest.raises(RuntimeError, match='load_many_async'):
+        asyncio.run(handler())
+
+
+def test_async_loads_share_the_query_cache(tmp_path):
+    db_path = tmp_path / 'app.db'
+    pipeline = DataPipeline(
+        f'sqlite:///{db_path}',
+        cache_dir=str(tmp_path / 'cache'),
+        async_connection_string=f'sqlite+aiosqlite:///{db_path}'
+    )
+    with pipeline.engine.begin() as conn:
+        conn.execute(text('CREATE TABLE t (x INTEGER)'))
+        conn.execute(text('INSERT INTO t VALUES (1), (2)'))
+
+    query = 'SELECT x FROM t ORDER BY x'
+    pipeline.load_from_query(query)
+    with pipeline.engine.begin() as conn:
+        conn.execute(text('INSERT INTO t VALUES (3)'))
+
+    cached = pipeline.load_many({'t': (query, None)})['t']
+    fresh = pipeline.load_many({'t': (query, None)}, use_cache=False)['t']
+
+    assert cached['x'].tolist() == [1, 2]
+    assert fresh['x'].tolist() == [1, 2, 3]
+
+    pipeline.invalidate_cache()
+    pipeline.load_many({'t': (query, None)})
+    assert pipeline.load_from_query(query)['x'].tolist() == [1, 2, 3]
+    assert pipeline.cache.get(query) is not None
+
+
+def test_user_features_filter_ids_and_dates_on_any_database(tmp_path):
+    pipeline = DataPipeline(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    with pipeline.engine.begin() as conn:
+        conn.execute(text('CREATE TABLE users (id TEXT, created_at TEXT, subscription_tier TEXT)'))
+        conn.execute(text(
+            "INSERT INTO users VALUES ('a', '2024-01-01', 'free'), ('b', '2024-06-01', 'pro'), ('c', '2024-07-01', 'free')"
+        ))
+        for table in ('habit_checkins', 'goals', 'user_sessions'):
+            conn.execute(text(f'CREATE TABLE {table} (id INTEGER, user_id TEXT)'))
+        conn.execute(text("INSERT INTO habit_checkins VALUES (1, 'a'), (2, 'b'), (3, 'b'), (4, 'c')"))
+        conn.execute(text("INSERT INTO goals VALUES (1, 'b')"))
+
+    by_id = pipeline.load_user_features(user_ids=['a', 'b'], id_batch_size=1).set_index('user_id')
+    assert by_id['total_checkins'].to_dict() == {'a': 1, 'b': 2}
+
+    by_date = pipeline.load_user_features(start_date='2024-05-01', end_date='2024-06-30').set_index('user_id')
+    assert by_date[['total_checkins', 'total_goals', 'total_sessions']].to_dict('index') == {
+        'b': {'total_checkins': 2, 'total_goals': 1, 'total_sessions': 0}
+    }
+
+
+def test_user_features_aggregates_only_selected_users():
+    query = DataPipeline.build_user_features_query(filter_start_date=True)
+
+    assert query.count('JOIN selected_users s ON s.id = c.user_id') == 3
+
+
+def _imbalanced_frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'checkins': rng.integers(0, 30, 300),
+        'minutes': rng.normal(30, 5, 300),
+        'churned': (rng.random(300) < 0.2).astype(np.int64),
+    })
+    return df.set_index(pd.RangeIndex(1000, 1300))
+
+
+@pytest.mark.parametrize('method', ['undersample', 'oversample', 'smote'])
+def test_balance_dataset_returns_fresh_index_and_source_dtypes(pipeline, method):
+    df = _imbalanced_frame()
+
+    balanced = pipeline.balance_dataset(df, 'churned', method=method, n_jobs=1)
+
+    assert balanced.index.equals(pd.RangeIndex(len(balanced)))
+    assert balanced.dtypes.equals(df.dtypes)
+    assert balanced['churned'].value_counts().nunique() == 1
+    assert np.array_equal(balanced['checkins'], np.round(balanced['checkins']))
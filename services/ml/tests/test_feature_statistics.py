@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from FeatureStatistics import FeatureStatisticsAccumulator
+
+
+def test_column_that_starts_all_null_gets_numeric_statistics():
+    chunks = [
+        pd.DataFrame({'streak': pd.Series([None, None, None], dtype=object)}),
+        pd.DataFrame({'streak': np.arange(100, dtype=np.float64)}),
+        pd.DataFrame({'streak': np.arange(100, 200, dtype=np.int64)}),
+    ]
+
+    stats = FeatureStatisticsAccumulator().consume(chunks).to_dict()['streak']
+
+    assert stats['count'] == 200
+    assert stats['missing_count'] == 3
+    assert stats['min'] == 0 and stats['max'] == 199
+    assert 80 <= stats['50%'] <= 120
+
+
+def test_merge_promotes_a_worker_that_only_saw_nulls():
+    nulls = FeatureStatisticsAccumulator().consume(
+        [pd.DataFrame({'streak': pd.Series([None] * 5, dtype=object)})]
+    )
+    values = FeatureStatisticsAccumulator().consume([pd.DataFrame({'streak': np.arange(50.0)})])
+
+    nulls.merge(values)
+    stats = nulls.to_dict()['streak']
+
+    assert stats['count'] == 50
+    assert stats['missing_count'] == 5
+    assert stats['mean'] == 24.5
+
+
+def test_distinct_counts_do_not_depend_on_chunk_dtype():
+    values = np.arange(-60, 60)
+    by_dtype = {}
+    for dtype in [np.int8, np.int32, np.int64, np.float32, np.float64]:
+        acc = FeatureStatisticsAccumulator().consume([pd.DataFrame({'x': values.astype(dtype)})])
+        by_dtype[dtype] = acc.columns['x'].distinct.registers
+
+    mixed = FeatureStatisticsAccumulator().consume([
+        pd.DataFrame({'x': values[:60].astype(np.int8)}),
+        pd.DataFrame({'x': values[60:].astype(np.float64)}),
+        pd.DataFrame({'x': values.astype(np.int32)}),
+    ])
+
+    for registers in by_dtype.values():
+        np.testing.assert_array_equal(registers, by_dtype[np.int64])
+    np.testing.assert_array_equal(mixed.columns['x'].distinct.registers, by_dtype[np.int64])
+    assert abs(mixed.to_dict()['x']['unique_count'] - 120) <= 3
+
+
+def test_streamed_quantiles_are_reproducible():
+    rng = np.random.default_rng(0)
+    chunks = [pd.DataFrame({'minutes': rng.normal(30, 5, 5000)}) for _ in range(20)]
+
+    first = FeatureStatisticsAccumulator(kll_k=50).consume(chunks).to_dict()['minutes']
+    second = FeatureStatisticsAccumulator(kll_k=50).consume(chunks).to_dict()['minutes']
+
+    assert [first[q] for q in ('25%', '50%', '75%')] == [second[q] for q in ('25%', '50%', '75%')]
+
+
+def test_in_memory_frame_statistics_are_exact():
+    from DataPipeline import DataPipeline
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'minutes': rng.normal(30, 5, 20_000),
+        'streak': rng.integers(0, 5000, 20_000),
+        'tier': rng.choice(['free', 'premium', None], 20_000),
+    })
+
+    stats = DataPipeline('sqlite://').generate_feature_statistics(df)
+    expected = df[['minutes', 'streak']].describe().T
+
+    pd.testing.assert_frame_equal(
+        stats.loc[['minutes', 'streak'], expected.columns].astype(float), expected
+    )
+    assert stats.loc['streak', 'unique_count'] == df['streak'].nunique()
+    assert stats.loc['tier', 'count'] == df['tier'].notna().sum()
+    assert stats.loc['tier', 'unique_count'] == 2
@@ -0,0 +1,43 @@
+import warnings
+
+import numpy as np
+
+from models.habit_success_predictor import DEFAULT_MODEL_PARAMS, HabitSuccessPredictor
+from models.hyperparameter_search import HyperparameterSearch
+
+
+def _data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+def test_trial_params_leave_round_count_to_xgb_train():
+    search = HyperparameterSearch(base_params=dict(DEFAULT_MODEL_PARAMS), max_bin=64)
+
+    params = search._trial_params({'max_depth': 4})
+
+    assert 'n_estimators' not in params
+    assert params['tree_method'] == 'hist' and params['max_bin'] == 64
+
+
+def test_best_params_retrain_with_search_histogram_settings():
+    X, y = _data()
+    search = HyperparameterSearch(
+        base_params=dict(DEFAULT_MODEL_PARAMS), n_trials=2, max_workers=1,
+        min_rounds=5, max_rounds=10, max_bin=64
+    )
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings('error', message='.*n_estimators.*')
+        result = search.run(X[:300], y[:300], X[300:], y[300:])
+
+    best_params = result['best_params']
+    assert best_params['tree_method'] == 'hist'
+    assert best_params['max_bin'] == 64
+
+    predictor = HabitSuccessPredictor(params=best_params)
+    model_params = predictor.model.get_params()
+    assert model_params['tree_method'] == 'hist' and model_params['max_bin'] == 64
+    assert predictor._get_model_params()['max_bin'] == 64
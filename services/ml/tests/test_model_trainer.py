@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import models.model_trainer as model_trainer
+from models.habit_success_predictor import HabitSuccessPredictor
+from models.model_trainer import ModelTrainer
+
+
+def make_window(seed: int, n: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.standard_normal((n, 3)), columns=['a', 'b', 'c'])
+    df['maintained'] = (df['a'] + rng.standard_normal(n) > 0).astype(int)
+    return df
+
+
+def make_predictor(df: pd.DataFrame) -> HabitSuccessPredictor:
+    predictor = HabitSuccessPredictor()
+    predictor.model = xgb.XGBClassifier(n_estimators=5, max_depth=2, random_state=0).fit(
+        df[['a', 'b', 'c']], df['maintained']
+    )
+    predictor.feature_names = ['a', 'b', 'c']
+    predictor.model_metadata = {
+        'metrics': {'roc_auc': 0.9, 'log_loss': 0.3},
+        'model_params': {'max_depth': 2, 'learning_rate': 0.3, 'objective': 'binary:logistic'},
+    }
+    return predictor
+
+
+def test_continue_training_stops_early_on_validation_split():
+    predictor = make_predictor(make_window(0))
+
+    # Labels unrelated to the features: extra trees only overfit
+    window = make_window(1)
+    window['maintained'] = np.random.default_rng(2).integers(0, 2, len(window))
+    metrics = predictor.continue_training(window, additional_rounds=200, early_stopping_rounds=5)
+
+    assert metrics['total_rounds'] < 5 + 200
+    assert metrics['best_iteration'] < metrics['total_rounds']
+
+
+def test_kept_previous_returns_previous_metrics(tmp_path, monkeypatch):
+    window = make_window(3)
+    trainer = ModelTrainer(str(tmp_path))
+    trainer.artifact_store.publish(make_predictor(make_window(0)))
+    monkeypatch.setattr(model_trainer, 'prepare_training_dataset', lambda habits, profiles: window)
+
+    # No candidate can clear a negative allowed drop, so the previous model is kept
+    metrics = trainer.retrain_incremental([], {}, additional_rounds=5, max_auc_drop=-1.0)
+
+    assert metrics['mode'] == 'kept_previous'
+    assert metrics['roc_auc'] == 0.9 and metrics['log_loss'] == 0.3
+    assert metrics['candidate_metrics']['additional_rounds'] == 5
+    assert trainer.predictor.model_metadata['metrics'] == {'roc_auc': 0.9, 'log_loss': 0.3}
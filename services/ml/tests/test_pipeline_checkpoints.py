@@ -0,0 +1,99 @@
+import numpy as np
+import xgboost as xgb
+
+from ChurnModelTrainer import ChurnModelTrainer
+from PipelineCheckpoints import PipelineCheckpoints
+from SyntheticChurnData import generate_feature_matrix
+
+
+def test_xgboost_checkpoint_keeps_wrapper_params(tmp_path):
+    X, y = generate_feature_matrix(2000, 'activity')
+    model = xgb.XGBClassifier(n_estimators=17, learning_rate=0.3, max_depth=3, early_stopping_rounds=4)
+    model.fit(X, y, eval_set=[(X, y)], verbose=False)
+
+    checkpoints = PipelineCheckpoints(str(tmp_path))
+    checkpoints.run('train', lambda work_dir: {'model': model})
+    restored = checkpoints.run('train', lambda work_dir: {'model': None})['model']
+
+    assert restored.n_estimators == 17
+    assert restored.early_stopping_rounds == 4
+    assert restored.get_xgb_params() == model.get_xgb_params()
+
+
+def test_resumed_cross_validation_matches_fresh(tmp_path):
+    X, y = generate_feature_matrix(4000, 'activity')
+
+    trainer = ChurnModelTrainer('sqlite://')
+    trainer.train(X[:3000], y[:3000], X[3000:], y[3000:], params={
+        'max_depth': 3,
+        'learning_rate': 0.2,
+        'n_estimators': 40,
+        'early_stopping_rounds': 5,
+        'objective': 'binary:logistic',
+        'eval_metric': 'auc',
+        'random_state': 42,
+    })
+    fresh = trainer.cross_validate(X, y, cv=3)
+
+    checkpoints = PipelineCheckpoints(str(tmp_path))
+    checkpoints.run('train', lambda work_dir: {'model': trainer.model})
+    trainer.model = checkpoints.run('train', lambda work_dir: {'model': None})['model']
+    resumed = trainer.cross_validate(X, y, cv=3)
+
+    np.testing.assert_array_equal(resumed, fresh)
+
+
+def test_train_stage_reruns_when_training_config_changes(tmp_path, monkeypatch):
+    from TrainingConfig import TrainingConfig
+
+    checkpoint_dir = str(tmp_path / 'checkpoints')
+    fits = []
+
+    def run(max_bin):
+        trainer = ChurnModelTrainer('sqlite://', TrainingConfig(max_bin=max_bin, n_threads=2))
+        monkeypatch.setattr(trainer.validator, 'validate_churn_model', lambda metrics: False)
+        original_train = trainer.train
+        monkeypatch.setattr(trainer, 'train', lambda *args, **kwargs: fits.append(max_bin) or original_train(*args, **kwargs))
+        trainer.run_pipeline(output_dir=str(tmp_path / 'out'), checkpoint_dir=checkpoint_dir, synthetic_rows=3000)
+        return trainer.model.get_params()['max_bin']
+
+    assert run(64) == 64
+    assert run(64) == 64
+    assert run(32) == 32
+    assert fits == [64, 32]
+
+
+def test_cross_validation_and_export_run_concurrently_on_split_budget(tmp_path, monkeypatch):
+    import os
+    import threading
+    from TrainingConfig import TrainingConfig
+
+    trainer = ChurnModelTrainer('sqlite://', TrainingConfig(n_threads=4))
+    monkeypatch.setattr(trainer.validator, 'validate_churn_model', lambda metrics: True)
+
+    both_running = threading.Barrier(2, timeout=30)
+    threads = {}
+
+    original_summary = trainer.cross_validation_summary
+
+    def cross_validation_summary(*args, n_threads=None, **kwargs):
+        threads['cross_validate'] = n_threads
+        both_running.wait()
+        return original_summary(*args, n_threads=n_threads, **kwargs)
+
+    def export_tfjs(output_dir, n_threads=None):
+        threads['export_tfjs'] = n_threads
+        both_running.wait()
+        os.makedirs(os.path.join(output_dir, 'tfjs'))
+        return {'format': 'graph_model'}
+
+    monkeypatch.setattr(trainer, 'cross_validation_summary', cross_validation_summary)
+    monkeypatch.setattr(trainer, 'export_tfjs', export_tfjs)
+
+    trainer.run_pipeline(
+        output_dir=str(tmp_path / 'out'), checkpoint_dir=str(tmp_path / 'checkpoints'), synthetic_rows=3000
+    )
+
+    assert threads == {'cross_validate': 2, 'export_tfjs': 2}
+    assert len(trainer.model_metadata['cross_validation']['folds']) == 5
+    assert trainer.model_metadata['tfjs_export'] == {'format': 'graph_model'}
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from QueryCache import QueryCache
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = QueryCache(str(tmp_path), ttl_seconds=60)
+    cache.put('SELECT 1', None, pd.DataFrame({'a': [1]}))
+
+    assert cache.get('SELECT 1') is not None
+
+    path = cache._path(cache.key('SELECT 1'))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    assert cache.get('SELECT 1') is None
+    assert not os.path.exists(path)
+
+
+def test_evicts_least_recently_read(tmp_path):
+    cache = QueryCache(str(tmp_path))
+    frame = pd.DataFrame({'a': range(1000)})
+
+    for i in range(3):
+        cache.put(f'SELECT {i}', None, frame)
+        path = cache._path(cache.key(f'SELECT {i}'))
+        os.utime(path, (1000 + i, time.time()))
+
+    # Reading SELECT 0 makes SELECT 1 the least recently read entry
+    assert cache.get('SELECT 0') is not None
+
+    cache.max_bytes = 2 * os.path.getsize(cache._path(cache.key('SELECT 0')))
+    assert cache.evict() == 1
+
+    assert cache.get('SELECT 0') is not None
+    assert cache.get('SELECT 1') is None
+    assert cache.get('SELECT 2') is not None
+
+
+def test_formatting_shares_key_but_literals_do_not(tmp_path):
+    cache = QueryCache(str(tmp_path))
+
+    assert cache.key('SELECT a\n  FROM t -- comment\n') == cache.key('SELECT a FROM t')
+    assert cache.key("SELECT * FROM t WHERE name = 'a  b'") != cache.key("SELECT * FROM t WHERE name = 'a b'")
+    assert cache.key("SELECT * FROM t WHERE note = '--x'") != cache.key("SELECT * FROM t WHERE note = '--y'")
+    assert cache.key('SELECT "my  col" FROM t') != cache.key('SELECT "my col" FROM t')
+    assert cache.key('SELECT 1', {'a': 1}) != cache.key('SELECT 1', {'a': 2})
+
+
+def test_entry_removed_concurrently_is_a_miss(tmp_path, monkeypatch):
+    cache = QueryCache(str(tmp_path))
+    cache.put('SELECT 1', None, pd.DataFrame({'a': [1]}))
+
+    def removed_before_read(path, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(feather, 'read_table', removed_before_read)
+    assert cache.get('SELECT 1') is None
+
+
+def test_evict_skips_entries_removed_concurrently(tmp_path, monkeypatch):
+    cache = QueryCache(str(tmp_path))
+    cache.put('SELECT 1', None, pd.DataFrame({'a': [1]}))
+    cache.max_bytes = 0
+
+    listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda path: listdir(path) + ['gone.feather'])
+
+    assert cache.evict() == 1
+    assert not cache.invalidate('SELECT 1')
+
+
+def test_put_skips_results_that_cannot_be_written(tmp_path, caplog):
+    cache = QueryCache(str(tmp_path))
+    # Mixed Python objects have no Arrow type
+    frame = pd.DataFrame({'user_id': [1, 'a']})
+
+    assert cache.put('SELECT user_id FROM users', None, frame) is False
+    assert cache.get('SELECT user_id FROM users') is None
+    assert os.listdir(tmp_path) == []
+    assert 'Could not cache query result' in caplog.text
@@ -0,0 +1,27 @@
+import pytest
+
+import TrainingConfig as training_config
+from TrainingConfig import TrainingConfig
+
+
+@pytest.mark.parametrize('cpus, budget', [(1, 1), (2, 1), (8, 7), (32, 29)])
+def test_default_budget_leaves_cpus_free(monkeypatch, cpus, budget):
+    monkeypatch.setattr(training_config, 'available_cpus', lambda: cpus)
+    monkeypatch.delenv('ML_TRAINING_THREADS', raising=False)
+    monkeypatch.delenv('ML_RESERVE_THREADS', raising=False)
+
+    assert TrainingConfig().thread_budget() == budget
+    assert TrainingConfig.from_env().thread_budget() == budget
+
+
+def test_reserve_and_budget_from_env(monkeypatch):
+    monkeypatch.setattr(training_config, 'available_cpus', lambda: 16)
+
+    monkeypatch.setenv('ML_RESERVE_THREADS', '0')
+    assert TrainingConfig.from_env().thread_budget() == 16
+
+    monkeypatch.setenv('ML_RESERVE_THREADS', '4')
+    assert TrainingConfig.from_env().thread_budget() == 12
+
+    monkeypatch.setenv('ML_TRAINING_THREADS', '3')
+    assert TrainingConfig.from_env().thread_budget() == 3
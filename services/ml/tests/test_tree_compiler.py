@@ -0,0 +1,69 @@
+import sys
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from churn_model_trainer import add_derived_features
+from conversion.tree_compiler import CompiledForest, synthetic_validation_rows, validate_compiled
+from ChurnModelTrainer import ChurnModelTrainer
+from SyntheticChurnData import generate_dataset, generate_feature_matrix
+
+
+def test_profile_validation_rows_include_derived_features():
+    df = add_derived_features(generate_dataset(2000, 'profile'))
+    X = df.drop(columns=['user_id', 'churned'])
+    model = xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(X, df['churned'])
+    booster = model.get_booster()
+
+    rows = synthetic_validation_rows(booster, 500, 'profile')
+    forest = CompiledForest.from_booster(booster)
+
+    assert rows.shape == (500, forest.n_features) == (500, 22)
+    assert validate_compiled(forest, booster, rows) < 1e-5
+
+
+def test_activity_validation_rows_are_scaled_with_stored_scaler(tmp_path):
+    X, y = generate_feature_matrix(3000, 'activity')
+
+    trainer = ChurnModelTrainer('sqlite://')
+    X_train = trainer.fit_scaler(X[:2400].copy())
+    X_val = trainer.scale_features(X[2400:].copy())
+    trainer.train(X_train, y[:2400], X_val, y[2400:], params={'n_estimators': 10, 'max_depth': 3})
+    trainer.evaluate(X_val, y[2400:])
+    trainer.save_model(str(tmp_path), convert=False)
+
+    booster = trainer.model.get_booster()
+    rows = synthetic_validation_rows(booster, 5000, 'activity')
+
+    assert rows.shape == (5000, 7)
+    np.testing.assert_allclose(rows.mean(axis=0), 0, atol=0.1)
+    np.testing.assert_allclose(rows.std(axis=0), 1, atol=0.25)
+
+
+def test_activity_validation_rows_need_stored_scaler():
+    X, y = generate_feature_matrix(1000, 'activity')
+    booster = xgb.XGBClassifier(n_estimators=5).fit(X, y).get_booster()
+
+    with pytest.raises(ValueError, match='feature_scaler'):
+        synthetic_validation_rows(booster, 100, 'activity')
+
+
+def test_synthetic_validation_rows_leave_import_path_alone():
+    df = add_derived_features(generate_dataset(500, 'profile'))
+    X = df.drop(columns=['user_id', 'churned'])
+    booster = xgb.XGBClassifier(n_estimators=3, max_depth=2).fit(X, df['churned']).get_booster()
+    path_before = list(sys.path)
+
+    synthetic_validation_rows(booster, 10, 'profile')
+    synthetic_validation_rows(booster, 10, 'profile')
+
+    assert sys.path == path_before
+
+
+def test_derived_threshold_flags_keep_integer_dtype():
+    df = add_derived_features(generate_dataset(200, 'profile'))
+
+    assert df['is_new_user'].dtype == np.dtype(int)
+    assert df['is_new_user'].tolist() == (df['days_since_signup'] < 30).astype(int).tolist()
+    assert df['goals_per_day'].dtype == np.float32
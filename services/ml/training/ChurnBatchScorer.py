@@ -0,0 +1,302 @@
+"""
+Churn Batch Scorer
+
+Scores every user with the latest churn model from churn_model_trainer.py
+and writes the probabilities back to user_profiles.churn_risk_score.
+
+The UUID space is split into contiguous user-id ranges, one per worker.
+Each worker pages through its range in keyset-ordered chunks (goal and habit
+aggregates are computed only for the chunk's users), builds the model input
+with the trainer's feature_matrix (same derived-feature spec as training),
+predicts with the booster and bulk-updates the chunk in one statement, so
+memory stays at one chunk per worker and no transaction spans the whole table.
+
+Usage:
+    python ChurnBatchScorer.py --model-dir ./models --workers 4 --chunk-rows 50000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sqlalchemy import text
+
+from DataPipeline import DataPipeline
+from TrainingConfig import TrainingConfig
+from churn_model_trainer import feature_matrix
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+MODEL_FILE_PATTERN = re.compile(r'^churn_model_(\d{8}_\d{6})\.json$')
+
+# Same raw columns as churn_model_trainer.extract_features, for one page of users
+SCORING_FEATURES_SQL = """
+WITH batch AS (
+    SELECT
+        u.id,
+        u.created_at,
+        u.last_login_at,
+        u.login_count,
+        u.total_session_duration_minutes,
+        up.engagement_score,
+        up.churn_risk_score
+    FROM users u
+    JOIN user_profiles up ON up.user_id = u.id
+    WHERE u.id BETWEEN CAST(:start_id AS UUID) AND CAST(:end_id AS UUID)
+    ORDER BY u.id
+    LIMIT :chunk_rows
+),
+g AS (
+    SELECT
+        user_id,
+        COUNT(*) as total_goals,
+        SUM(CASE WHEN status = 'ACTIVE' THEN 1 ELSE 0 END) as active_goals,
+        SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END) as completed_goals,
+        AVG(progress) as avg_goal_progress
+    FROM goals
+    WHERE user_id IN (SELECT id FROM batch)
+    GROUP BY user_id
+),
+h AS (
+    SELECT
+        user_id,
+        COUNT(*) as total_habits,
+        SUM(CASE WHEN status = 'ACTIVE' THEN 1 ELSE 0 END) as active_habits,
+        SUM(total_checkins) as total_checkins,
+        AVG(streak) as avg_streak,
+        MAX(longest_streak) as longest_streak
+    FROM habits
+    WHERE user_id IN (SELECT id FROM batch)
+    GROUP BY user_id
+)
+SELECT
+    b.id as user_id,
+    EXTRACT(EPOCH FROM (NOW() - b.created_at)) / 86400 as days_since_signup,
+    EXTRACT(EPOCH FROM (NOW() - b.last_login_at)) / 86400 as days_since_last_login,
+    b.login_count,
+    b.total_session_duration_minutes,
+    COALESCE(g.total_goals, 0) as total_goals,
+    COALESCE(g.active_goals, 0) as active_goals,
+    COALESCE(g.completed_goals, 0) as completed_goals,
+    COALESCE(g.avg_goal_progress, 0) as avg_goal_progress,
+    COALESCE(h.total_habits, 0) as total_habits,
+    COALESCE(h.active_habits, 0) as active_habits,
+    COALESCE(h.total_checkins, 0) as total_checkins,
+    COALESCE(h.avg_streak, 0) as avg_streak,
+    COALESCE(h.longest_streak, 0) as longest_streak,
+    COALESCE(b.engagement_score, 50.0) as engagement_score,
+    COALESCE(b.churn_risk_score, 0.5) as current_churn_risk
+FROM batch b
+LEFT JOIN g ON g.user_id = b.id
+LEFT JOIN h ON h.user_id = b.id
+ORDER BY b.id
+"""
+
+UPDATE_SCORES_SQL = """
+UPDATE user_profiles AS up
+SET churn_risk_score = s.score, last_updated = NOW()
+FROM unnest(CAST(:user_ids AS UUID[]), CAST(:scores AS DOUBLE PRECISION[])) AS s(user_id, score)
+WHERE up.user_id = s.user_id
+"""
+
+UPDATE_SCORE_SQL = """
+UPDATE user_profiles
+SET churn_risk_score = :score, last_updated = CURRENT_TIMESTAMP
+WHERE user_id = :user_id
+"""
+
+
+class ChurnBatchScorer:
+    """
+    Batch churn scoring into user_profiles
+
+    Args:
+        db_connection_string: Database URL
+        model_dir: Directory of churn_model_{version}.json files
+        training_config: Thread budget shared by the prediction workers
+    """
+
+    def __init__(
+        self,
+        db_connection_string: str,
+        model_dir: str = './models',
+        training_config: TrainingConfig = None
+    ):
+        self.data_pipeline = DataPipeline(db_connection_string)
+        self.engine = self.data_pipeline.engine
+        self.model_dir = model_dir
+        self.training_config = training_config or TrainingConfig.from_env()
+        self.booster = None
+        self.model_path = None
+        self.feature_names = []
+
+    @staticmethod
+    def latest_model_path(model_dir: str) -> str:
+        """Newest churn_model_{version}.json (versions are %Y%m%d_%H%M%S timestamps)"""
+        versions = sorted(
+            match.group(1)
+            for match in map(MODEL_FILE_PATTERN.match, os.listdir(model_dir))
+            if match
+        )
+        if not versions:
+            raise FileNotFoundError(f"No churn_model_<version>.json in {model_dir}")
+
+        return os.path.join(model_dir, f"churn_model_{versions[-1]}.json")
+
+    def load_model(self, model_path: Optional[str] = None):
+        self.model_path = model_path or self.latest_model_path(self.model_dir)
+
+        self.booster = xgb.Booster()
+        self.booster.load_model(self.model_path)
+
+        # Column order the model was trained with
+        self.feature_names = list(self.booster.feature_names or [])
+        if not self.feature_names:
+            raise ValueError(f"{self.model_path} has no feature names; retrain with churn_model_trainer.py")
+
+        logger.info(f"Loaded {self.model_path} ({len(self.feature_names)} features)")
+
+    @staticmethod
+    def user_id_ranges(n_ranges: int) -> List[Tuple[str, str]]:
+        """Split the UUID space into n contiguous inclusive (start_id, end_id) ranges"""
+        bounds = [i * (1 << 128) // n_ranges for i in range(n_ranges + 1)]
+        return [
+            (str(uuid.UUID(int=bounds[i])), str(uuid.UUID(int=bounds[i + 1] - 1)))
+            for i in range(n_ranges)
+        ]
+
+    def fetch_chunk(self, start_id: str, end_id: str, chunk_rows: int) -> pd.DataFrame:
+        return self.data_pipeline.load_from_query(
+            SCORING_FEATURES_SQL,
+            params={'start_id': start_id, 'end_id': end_id, 'chunk_rows': chunk_rows},
+            use_cache=False
+        )
+
+    def score_chunk(self, df: pd.DataFrame) -> np.ndarray:
+        """Churn probabilities for a frame of raw feature columns"""
+        X = feature_matrix(df, self.feature_names)
+        return self.booster.inplace_predict(X)
+
+    def write_scores(self, user_ids: List[str], scores: np.ndarray):
+        """
+        Bulk-update churn_risk_score for one chunk in one transaction
+
+        On PostgreSQL the chunk is sent as two arrays and joined with unnest in
+        a single UPDATE; other databases fall back to executemany.
+        """
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == 'postgresql':
+                conn.execute(
+                    text(UPDATE_SCORES_SQL),
+                    {'user_ids': list(user_ids), 'scores': scores.astype(float).tolist()}
+                )
+            else:
+                conn.execute(
+                    text(UPDATE_SCORE_SQL),
+                    [{'user_id': u, 'score': s} for u, s in zip(user_ids, scores.astype(float).tolist())]
+                )
+
+    def score_range(self, start_id: str, end_id: str, chunk_rows: int = 50_000, dry_run: bool = False) -> Dict:
+        """Score every user in [start_id, end_id], one keyset page at a time"""
+        n_users = 0
+        score_sum = 0.0
+        start = time.perf_counter()
+
+        while True:
+            df = self.fetch_chunk(start_id, end_id, chunk_rows)
+            if df.empty:
+                break
+
+            user_ids = df['user_id'].astype(str).tolist()
+            scores = self.score_chunk(df)
+            if not dry_run:
+                self.write_scores(user_ids, scores)
+
+            n_users += len(user_ids)
+            score_sum += float(scores.sum())
+
+            if len(df) < chunk_rows:
+                break
+
+            last_id = uuid.UUID(user_ids[-1]).int
+            if last_id >= uuid.UUID(end_id).int:
+                break
+            start_id = str(uuid.UUID(int=last_id + 1))
+
+        return {
+            'users': n_users,
+            'score_sum': score_sum,
+            'seconds': time.perf_counter() - start,
+        }
+
+    def run(self, workers: int = 1, chunk_rows: int = 50_000, dry_run: bool = False) -> Dict:
+        """
+        Score all users with `workers` ranges in parallel
+
+        Workers are threads: the booster is shared, prediction and database
+        I/O release the GIL, and the thread budget is divided between them.
+        """
+        if self.booster is None:
+            self.load_model()
+
+        self.booster.set_param({'nthread': max(1, self.training_config.thread_budget() // workers)})
+
+        start = time.perf_counter()
+        ranges = self.user_id_ranges(workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda bounds: self.score_range(*bounds, chunk_rows=chunk_rows, dry_run=dry_run),
+                ranges
+            ))
+
+        elapsed = time.perf_counter() - start
+        n_users = sum(result['users'] for result in results)
+
+        summary = {
+            'model_path': self.model_path,
+            'users': n_users,
+            'seconds': elapsed,
+            'users_per_second': n_users / max(elapsed, 1e-9),
+            'mean_score': sum(result['score_sum'] for result in results) / n_users if n_users else None,
+            'workers': workers,
+            'dry_run': dry_run,
+        }
+
+        logger.info(
+            f"Scored {n_users:,} users in {elapsed:.1f}s "
+            f"({summary['users_per_second']:,.0f} users/s, {workers} workers)"
+            + (" [dry run, nothing written]" if dry_run else "")
+        )
+
+        return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write churn risk scores to user_profiles')
+    parser.add_argument('--model-dir', type=str, default=os.getenv('MODEL_OUTPUT_DIR', './models'))
+    parser.add_argument('--model-path', type=str, default=None, help='Score with this model instead of the latest')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel user-id ranges')
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    parser.add_argument('--dry-run', action='store_true', help='Score without writing to user_profiles')
+    args = parser.parse_args()
+
+    db_connection_string = os.getenv('DATABASE_URL')
+    if not db_connection_string:
+        print("ERROR: DATABASE_URL environment variable not set")
+        sys.exit(1)
+
+    scorer = ChurnBatchScorer(db_connection_string, args.model_dir)
+    scorer.load_model(args.model_path)
+    scorer.run(workers=args.workers, chunk_rows=args.chunk_rows, dry_run=args.dry_run)
@@ -0,0 +1,263 @@
+"""
+Churn Feature Rollup
+
+Maintains a daily-partitioned per-user activity rollup in PostgreSQL and
+derives the churn training features from it, so extracting training data
+reads a small pre-aggregated table instead of scanning and joining the full
+habit_checkins / user_sessions / goals history.
+
+Tables:
+    user_activity_daily        one row per (user, day): check-ins, sessions, session minutes
+    user_goal_progress_daily   latest active goal progress snapshot per user (replaced on refresh)
+    ml_rollup_watermarks       last fully refreshed day per rollup
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+ROLLUP_NAME = 'user_activity_daily'
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS user_activity_daily (
+      user_id UUID NOT NULL,
+      activity_date DATE NOT NULL,
+      checkins_total INTEGER NOT NULL DEFAULT 0,
+      checkins_completed INTEGER NOT NULL DEFAULT 0,
+      last_checkin_at TIMESTAMPTZ,
+      sessions INTEGER NOT NULL DEFAULT 0,
+      sessions_closed INTEGER NOT NULL DEFAULT 0,
+      session_minutes DOUBLE PRECISION NOT NULL DEFAULT 0,
+      last_session_at TIMESTAMPTZ,
+      PRIMARY KEY (user_id, activity_date)
+    ) PARTITION BY RANGE (activity_date)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_activity_daily_default
+      PARTITION OF user_activity_daily DEFAULT
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_goal_progress_daily (
+      user_id UUID NOT NULL,
+      snapshot_date DATE NOT NULL,
+      avg_progress DOUBLE PRECISION NOT NULL,
+      active_goals INTEGER NOT NULL,
+      PRIMARY KEY (user_id, snapshot_date)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ml_rollup_watermarks (
+      name TEXT PRIMARY KEY,
+      refreshed_until DATE NOT NULL,
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+]
+
+REFRESH_ACTIVITY_SQL = """
+INSERT INTO user_activity_daily (
+  user_id, activity_date,
+  checkins_total, checkins_completed, last_checkin_at,
+  sessions, sessions_closed, session_minutes, last_session_at
+)
+SELECT
+  user_id,
+  activity_date,
+  SUM(checkins_total),
+  SUM(checkins_completed),
+  MAX(last_checkin_at),
+  SUM(sessions),
+  SUM(sessions_closed),
+  SUM(session_minutes),
+  MAX(last_session_at)
+FROM (
+  SELECT
+    user_id,
+    created_at::date as activity_date,
+    COUNT(*) as checkins_total,
+    COUNT(*) FILTER (WHERE status = 'completed') as checkins_completed,
+    MAX(created_at) as last_checkin_at,
+    0 as sessions,
+    0 as sessions_closed,
+    0.0 as session_minutes,
+    NULL::timestamptz as last_session_at
+  FROM habit_checkins
+  WHERE created_at >= :since AND created_at < :until
+  GROUP BY 1, 2
+
+  UNION ALL
+
+  SELECT
+    user_id,
+    created_at::date as activity_date,
+    0, 0, NULL::timestamptz,
+    COUNT(*),
+    COUNT(logout_at),
+    COALESCE(SUM(EXTRACT(EPOCH FROM (logout_at - login_at)) / 60.0), 0),
+    MAX(created_at)
+  FROM user_sessions
+  WHERE created_at >= :since AND created_at < :until
+  GROUP BY 1, 2
+) daily
+GROUP BY user_id, activity_date
+"""
+
+# Only the latest snapshot is read, so each refresh replaces the previous ones
+CLEAR_GOALS_SQL = "DELETE FROM user_goal_progress_daily"
+
+REFRESH_GOALS_SQL = """
+INSERT INTO user_goal_progress_daily (user_id, snapshot_date, avg_progress, active_goals)
+SELECT user_id, CURRENT_DATE, AVG(progress_percentage), COUNT(*)
+FROM goals
+WHERE status = 'active'
+GROUP BY user_id
+"""
+
+CHURN_FEATURES_SQL = """
+WITH activity AS (
+  SELECT
+    r.user_id,
+    MAX(r.last_checkin_at) as last_checkin_at,
+    SUM(r.checkins_total) as total_checkins,
+    SUM(r.checkins_completed) FILTER (WHERE r.activity_date > CURRENT_DATE - 7) as completed_7d,
+    SUM(r.checkins_total) FILTER (WHERE r.activity_date > CURRENT_DATE - 7) as total_7d,
+    SUM(r.checkins_completed) FILTER (WHERE r.activity_date > CURRENT_DATE - 14) as completed_14d,
+    SUM(r.checkins_total) FILTER (WHERE r.activity_date > CURRENT_DATE - 14) as total_14d,
+    SUM(r.sessions) FILTER (WHERE r.activity_date > CURRENT_DATE - 14) as sessions_14d,
+    SUM(r.sessions_closed) FILTER (WHERE r.activity_date > CURRENT_DATE - 14) as closed_sessions_14d,
+    SUM(r.session_minutes) FILTER (WHERE r.activity_date > CURRENT_DATE - 14) as session_minutes_14d,
+    MAX(r.last_session_at) as last_session_at
+  FROM user_activity_daily r
+  WHERE r.activity_date >= CURRENT_DATE - CAST(:lookback_days AS INTEGER) - 1
+  GROUP BY r.user_id
+),
+latest_goals AS (
+  SELECT user_id, avg_progress
+  FROM user_goal_progress_daily
+  WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM user_goal_progress_daily)
+)
+SELECT
+  u.id as user_id,
+  EXTRACT(EPOCH FROM (NOW() - a.last_checkin_at)) / 86400 as days_since_last_checkin,
+  COALESCE(CAST(a.completed_7d AS FLOAT) / NULLIF(a.total_7d, 0), 0) as completion_rate_7d,
+  COALESCE(CAST(a.completed_14d AS FLOAT) / NULLIF(a.total_14d, 0), 0) as completion_rate_14d,
+  COALESCE(CAST(a.sessions_14d AS FLOAT) / 14.0, 0) as session_frequency_14d,
+  COALESCE(a.session_minutes_14d / NULLIF(a.closed_sessions_14d, 0), 0) as avg_session_duration_14d,
+  COALESCE(g.avg_progress, 0) / 100.0 as goal_progress_rate,
+  EXTRACT(EPOCH FROM (NOW() - u.created_at)) / 86400 as days_on_platform,
+  CASE
+    WHEN a.last_session_at < NOW() - INTERVAL '30 days' THEN 1
+    ELSE 0
+  END as churned
+FROM users u
+JOIN activity a ON a.user_id = u.id
+LEFT JOIN latest_goals g ON g.user_id = u.id
+WHERE u.created_at >= NOW() - make_interval(days => CAST(:lookback_days AS INTEGER))
+  AND a.total_checkins > 5
+"""
+
+
+class ChurnFeatureRollup:
+    """
+    Incrementally maintained daily activity rollup for churn features
+
+    refresh() only recomputes days since the last watermark (minus a
+    late-arrival margin), replacing those days' rows and the goal progress
+    snapshot in one transaction.
+    """
+
+    def __init__(self, data_pipeline, late_arrival_days: int = 2):
+        self.data_pipeline = data_pipeline
+        self.engine = data_pipeline.engine
+        self.late_arrival_days = late_arrival_days
+
+    def create_schema(self):
+        """
+        Create rollup tables if they do not exist
+        """
+        with self.engine.begin() as conn:
+            for statement in SCHEMA_SQL:
+                conn.execute(text(statement))
+
+    def ensure_partitions(self, start: date, end: date):
+        """
+        Create daily partitions covering [start, end)
+        """
+        with self.engine.begin() as conn:
+            day = start
+            while day < end:
+                partition = f"user_activity_daily_p{day:%Y%m%d}"
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF user_activity_daily "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+                day += timedelta(days=1)
+
+    def get_watermark(self) -> Optional[date]:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT refreshed_until FROM ml_rollup_watermarks WHERE name = :name"),
+                {'name': ROLLUP_NAME}
+            ).scalar()
+
+    def refresh(self, since: Optional[date] = None, backfill_days: int = 365):
+        """
+        Recompute rollup rows from `since` (default: watermark minus the
+        late-arrival margin, or backfill_days ago on first run) through today
+        """
+        self.create_schema()
+
+        today = date.today()
+        if since is None:
+            watermark = self.get_watermark()
+            if watermark is None:
+                since = today - timedelta(days=backfill_days)
+            else:
+                since = watermark - timedelta(days=self.late_arrival_days)
+
+        until = today + timedelta(days=1)
+        self.ensure_partitions(since, until)
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM user_activity_daily WHERE activity_date >= :since AND activity_date < :until"),
+                {'since': since, 'until': until}
+            )
+            inserted = conn.execute(text(REFRESH_ACTIVITY_SQL), {'since': since, 'until': until}).rowcount
+            conn.execute(text(CLEAR_GOALS_SQL))
+            conn.execute(text(REFRESH_GOALS_SQL))
+            conn.execute(
+                text("""
+                INSERT INTO ml_rollup_watermarks (name, refreshed_until, updated_at)
+                VALUES (:name, :until, NOW())
+                ON CONFLICT (name) DO UPDATE
+                  SET refreshed_until = EXCLUDED.refreshed_until, updated_at = EXCLUDED.updated_at
+                """),
+                {'name': ROLLUP_NAME, 'until': today}
+            )
+
+        logger.info(f"Refreshed {inserted} rollup rows for {since} .. {today}")
+
+    def load_features(self, lookback_days: int = 90, chunksize: Optional[int] = None) -> pd.DataFrame:
+        """
+        Derive churn features (same columns as ChurnModelTrainer.load_data) from the rollup
+
+        Windows are day-granular: '7d' covers today and the previous 6 calendar days.
+        """
+        params = {'lookback_days': lookback_days}
+
+        if chunksize:
+            return pd.concat(
+                self.data_pipeline.stream_from_query(CHURN_FEATURES_SQL, params=params, chunksize=chunksize),
+                ignore_index=True
+            )
+
+        return self.data_pipeline.load_from_query(CHURN_FEATURES_SQL, params)
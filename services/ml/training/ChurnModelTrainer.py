@@ -3,16 +3,24 @@ Churn Prediction Model Trainer
 
 Trains XGBoost model for predicting user churn
 Target accuracy: >89%
+
+TensorFlow and tensorflowjs are only imported by the TF.js export stage
+(conversion.tree_compiler loads them when a model is converted), so
+importing this module does not pay their import cost.
 """
 
+import argparse
 import os
 import sys
 import json
+import shutil
+import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import xgboost as xgb
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.metrics import (
     accuracy_score,
     precision_score,
@@ -24,14 +32,17 @@ from sklearn.metrics import (
 )
 from sklearn.preprocessing import StandardScaler
 import joblib
-import tensorflowjs as tfjs
-import tensorflow as tf
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from DataPipeline import DataPipeline
+from ChurnFeatureRollup import ChurnFeatureRollup
 from ModelValidator import ModelValidator
+from PipelineCheckpoints import PipelineCheckpoints
+from SyntheticChurnData import generate_dataset
+from TrainingConfig import TrainingConfig, ResourceMonitor
+from conversion.tree_compiler import CompiledForest, validate_compiled
 
 
 class ChurnModelTrainer:
@@ -39,10 +50,13 @@ class ChurnModelTrainer:
     Churn prediction model trainer with XGBoost
     """
 
-    def __init__(self, db_connection_string: str):
+    def __init__(self, db_connection_string: str, training_config: TrainingConfig = None):
         self.db_connection_string = db_connection_string
         self.data_pipeline = DataPipeline(db_connection_string)
+        self.feature_rollup = ChurnFeatureRollup(self.data_pipeline)
         self.validator = ModelValidator()
+        self.training_config = training_config or TrainingConfig.from_env()
+        self.training_resources = {}
 
         self.feature_names = [
             'days_since_last_checkin',
@@ -54,16 +68,33 @@ class ChurnModelTrainer:
             'days_on_platform',
         ]
 
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.model = None
         self.model_metadata = {}
 
-    def load_data(self, lookback_days: int = 90) -> pd.DataFrame:
+    def load_data(self, lookback_days: int = 90, chunksize: int = None, use_rollup: bool = False) -> pd.DataFrame:
         """
         Load training data from database
+
+        With chunksize set, rows are streamed through a server-side cursor and
+        downcast chunk by chunk, so peak memory stays near the final frame size
+
+        With use_rollup set, the daily activity rollup is refreshed for the days
+        since its last watermark and features are derived from it instead of
+        recomputing them from the raw activity tables
         """
         print(f"Loading data for last {lookback_days} days...")
 
+        if use_rollup:
+            self.feature_rollup.refresh()
+            df = self.feature_rollup.load_features(lookback_days, chunksize=chunksize)
+
+            print(f"Loaded {len(df)} user records")
+            print(f"Churn rate: {df['churned'].mean():.2%}")
+            print(f"Class distribution:\n{df['churned'].value_counts()}")
+
+            return df
+
         query = f"""
         WITH user_features AS (
           SELECT
@@ -122,7 +153,13 @@ class ChurnModelTrainer:
         SELECT * FROM user_features
         """
 
-        df = self.data_pipeline.load_from_query(query)
+        if chunksize:
+            df = pd.concat(
+                self.data_pipeline.stream_from_query(query, chunksize=chunksize),
+                ignore_index=True
+            )
+        else:
+            df = self.data_pipeline.load_from_query(query)
 
         print(f"Loaded {len(df)} user records")
         print(f"Churn rate: {df['churned'].mean():.2%}")
@@ -130,31 +167,51 @@ class ChurnModelTrainer:
 
         return df
 
+    def load_synthetic_data(self, n_rows: int, seed: int = 42) -> pd.DataFrame:
+        """
+        Generate training data with the same columns as load_data, without a database
+        """
+        print(f"Generating {n_rows:,} synthetic user records...")
+
+        df = generate_dataset(n_rows, schema='activity', seed=seed)
+
+        print(f"Churn rate: {df['churned'].mean():.2%}")
+
+        return df
+
     def prepare_features(self, df: pd.DataFrame):
         """
         Prepare features and labels
+
+        Returns an unscaled float32 feature matrix (one copy of the frame, with
+        missing values replaced in place); scaling is fitted on the training
+        split by fit_scaler so no test statistics leak into training
         """
-        X = df[self.feature_names].values
-        y = df['churned'].values
+        X = df[self.feature_names].to_numpy(dtype=np.float32, na_value=np.nan, copy=True)
+        y = df['churned'].to_numpy()
 
         # Handle missing values
-        X = np.nan_to_num(X, nan=0.0)
-
-        # Normalize features
-        X = self.scaler.fit_transform(X)
+        np.nan_to_num(X, copy=False, nan=0.0)
 
         return X, y
 
-    def train(
-        self,
-        X_train,
-        y_train,
-        X_val,
-        y_val,
-        params: dict = None
-    ):
+    def fit_scaler(self, X_train: np.ndarray) -> np.ndarray:
         """
-        Train XGBoost model
+        Fit the scaler on the training split and standardize it in place
+        """
+        self.scaler = StandardScaler(copy=False)
+        return self.scaler.fit_transform(X_train)
+
+    def scale_features(self, X: np.ndarray) -> np.ndarray:
+        """
+        Standardize with the fitted scaler, in place for float32 arrays
+        """
+        return self.scaler.transform(X, copy=False)
+
+    def training_params(self, y_train, params: dict = None) -> dict:
+        """
+        XGBClassifier parameters train() uses: the configured tree method,
+        bins and threads, overridden by params (defaults when None)
         """
         if params is None:
             params = {
@@ -168,19 +225,41 @@ class ChurnModelTrainer:
                 'scale_pos_weight': len(y_train[y_train == 0]) / len(y_train[y_train == 1]),  # Handle imbalance
             }
 
+        # Explicit params override the configured tree method / bins / threads
+        return {**self.training_config.xgb_params(), **params}
+
+    def train(
+        self,
+        X_train,
+        y_train,
+        X_val,
+        y_val,
+        params: dict = None
+    ):
+        """
+        Train XGBoost model
+        """
+        params = self.training_params(y_train, params)
+
         print("Training XGBoost model...")
         print(f"Parameters: {params}")
 
         self.model = xgb.XGBClassifier(**params)
 
-        self.model.fit(
-            X_train,
-            y_train,
-            eval_set=[(X_val, y_val)],
-            verbose=True
-        )
+        with ResourceMonitor() as monitor:
+            self.model.fit(
+                X_train,
+                y_train,
+                eval_set=[(X_val, y_val)],
+                verbose=True
+            )
+
+        self.training_resources = monitor.to_dict()
 
-        print("Training completed!")
+        print(
+            f"Training completed in {self.training_resources['training_seconds']:.1f}s "
+            f"(peak RSS {self.training_resources['peak_rss_mb']:.0f} MB)"
+        )
 
     def evaluate(self, X_test, y_test):
         """
@@ -222,37 +301,146 @@ class ChurnModelTrainer:
             'training_date': datetime.now().isoformat(),
             'model_type': 'xgboost',
             'target_accuracy': 0.89,
+            'training_config': self.training_config.to_dict(),
+            'training_resources': self.training_resources,
         }
 
         return metrics
 
-    def cross_validate(self, X, y, cv: int = 5):
+    def cross_validate(
+        self,
+        X,
+        y,
+        cv: int = 5,
+        params: dict = None,
+        num_boost_round: int = None,
+        early_stopping_rounds: int = None,
+        max_bin: int = None,
+        n_workers: int = None
+    ):
         """
-        Perform cross-validation
+        Perform cross-validation and record the result in model_metadata
+        """
+        summary = self.cross_validation_summary(
+            X, y, cv, params, num_boost_round, early_stopping_rounds, max_bin, n_workers
+        )
+        self.model_metadata['cross_validation'] = summary
+
+        return np.array([fold['roc_auc'] for fold in summary['folds']])
+
+    def cross_validation_summary(
+        self,
+        X,
+        y,
+        cv: int = 5,
+        params: dict = None,
+        num_boost_round: int = None,
+        early_stopping_rounds: int = None,
+        max_bin: int = None,
+        n_workers: int = None,
+        n_threads: int = None
+    ) -> dict:
+        """
+        Cross-validation folds and summary, without touching trainer state
+
+        Folds train concurrently with the native xgb.train API. Each fold's
+        quantile cuts come from its training rows only (the held-out part
+        reuses them via ref), and each fold early-stops on its held-out part.
+        Hyperparameters default to those of the trained model; folds share
+        n_threads (default: the configured thread budget).
         """
         print(f"\nPerforming {cv}-fold cross-validation...")
 
+        if params is None:
+            params = {k: v for k, v in self.model.get_xgb_params().items() if v is not None}
+        if num_boost_round is None:
+            num_boost_round = self.model.n_estimators or 200
+        if early_stopping_rounds is None:
+            early_stopping_rounds = self.model.early_stopping_rounds or 20
+
+        max_bin = max_bin or self.training_config.max_bin
+        n_workers = n_workers or cv
+        threads_per_fold = max(1, (n_threads or self.training_config.thread_budget()) // n_workers)
+
+        params = dict(params)
+        params.pop('n_jobs', None)
+        params.update({'tree_method': 'hist', 'max_bin': max_bin, 'nthread': threads_per_fold})
+        params.setdefault('eval_metric', 'auc')
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y)
+
+        start = time.perf_counter()
+
         skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
 
-        scores = cross_val_score(
-            self.model,
-            X,
-            y,
-            cv=skf,
-            scoring='roc_auc'
-        )
+        def run_fold(fold, train_idx, val_idx):
+            fold_start = time.perf_counter()
 
+            dtrain = xgb.QuantileDMatrix(X[train_idx], y[train_idx], max_bin=max_bin, nthread=threads_per_fold)
+            dval = xgb.QuantileDMatrix(X[val_idx], y[val_idx], ref=dtrain, max_bin=max_bin, nthread=threads_per_fold)
+
+            booster = xgb.train(
+                params,
+                dtrain,
+                num_boost_round=num_boost_round,
+                evals=[(dval, 'validation')],
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=False
+            )
+
+            y_pred_proba = booster.predict(dval, iteration_range=(0, booster.best_iteration + 1))
+
+            return {
+                'fold': fold,
+                'roc_auc': float(roc_auc_score(y[val_idx], y_pred_proba)),
+                'best_iteration': int(booster.best_iteration),
+                'wall_seconds': time.perf_counter() - fold_start,
+            }
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            folds = list(executor.map(
+                lambda args: run_fold(*args),
+                [(fold, train_idx, val_idx) for fold, (train_idx, val_idx) in enumerate(skf.split(X, y))]
+            ))
+
+        wall_seconds = time.perf_counter() - start
+        scores = np.array([fold['roc_auc'] for fold in folds])
+
+        for fold in folds:
+            print(
+                f"Fold {fold['fold']}: AUC {fold['roc_auc']:.4f}, "
+                f"best iteration {fold['best_iteration']}, {fold['wall_seconds']:.2f}s"
+            )
         print(f"Cross-validation AUC scores: {scores}")
         print(f"Mean AUC: {scores.mean():.4f} (+/- {scores.std() * 2:.4f})")
+        print(f"Cross-validation wall time: {wall_seconds:.2f}s")
 
-        return scores
+        return {
+            'folds': folds,
+            'mean_roc_auc': float(scores.mean()),
+            'std_roc_auc': float(scores.std()),
+            'wall_seconds': wall_seconds,
+        }
 
-    def save_model(self, output_dir: str = './models/churn-predictor'):
+    def save_model(self, output_dir: str = './models/churn-predictor', convert: bool = True):
         """
         Save model in multiple formats
+
+        The scaler parameters are stored as a booster attribute, so the model
+        file alone is enough to reproduce inference. With convert=False the
+        TF.js export is skipped (run_pipeline exports it as a separate stage)
         """
         os.makedirs(output_dir, exist_ok=True)
 
+        scaler_params = {
+            'feature_names': self.feature_names,
+            'mean': self.scaler.mean_.tolist(),
+            'scale': self.scaler.scale_.tolist(),
+        }
+        self.model.get_booster().set_attr(feature_scaler=json.dumps(scaler_params))
+        self.model_metadata['feature_scaler'] = scaler_params
+
         # Save XGBoost model
         joblib.dump(self.model, os.path.join(output_dir, 'model.pkl'))
         print(f"Saved XGBoost model to {output_dir}/model.pkl")
@@ -261,95 +449,211 @@ class ChurnModelTrainer:
         joblib.dump(self.scaler, os.path.join(output_dir, 'scaler.pkl'))
         print(f"Saved scaler to {output_dir}/scaler.pkl")
 
+        # Convert to TensorFlow.js format
+        if convert:
+            self.convert_to_tfjs(output_dir)
+
         # Save metadata
         with open(os.path.join(output_dir, 'metadata.json'), 'w') as f:
             json.dump(self.model_metadata, f, indent=2)
         print(f"Saved metadata to {output_dir}/metadata.json")
 
-        # Convert to TensorFlow.js format
-        self.convert_to_tfjs(output_dir)
+    @staticmethod
+    def scaler_from_booster(booster):
+        """
+        Rebuild the StandardScaler stored on a booster by save_model
+        """
+        params = json.loads(booster.attr('feature_scaler'))
+
+        scaler = StandardScaler()
+        scaler.mean_ = np.asarray(params['mean'])
+        scaler.scale_ = np.asarray(params['scale'])
+        scaler.var_ = scaler.scale_ ** 2
+        scaler.n_features_in_ = len(params['mean'])
+        return scaler
 
     def convert_to_tfjs(self, output_dir: str):
         """
-        Convert XGBoost model to TensorFlow.js format
+        Convert XGBoost model to TensorFlow.js format and record the export in model_metadata
+        """
+        self.model_metadata['tfjs_export'] = self.export_tfjs(output_dir)
+
+    def export_tfjs(self, output_dir: str, n_threads: int = None) -> dict:
+        """
+        Write the TF.js graph model to output_dir/tfjs and return its summary
+
+        The trees are compiled into an exact gather/compare/select graph, so
+        the TF.js graph model reproduces the booster's probabilities. Only
+        reads the trained model, so it can run alongside cross-validation;
+        the validation predictions use n_threads (default: the thread budget).
         """
         print("Converting to TensorFlow.js format...")
 
-        # Create simple TF model that mimics XGBoost predictions
-        # This is a simplified conversion - for production, consider using ONNX
-
-        # Get predictions on sample data to learn the mapping
-        X_sample = np.random.randn(1000, len(self.feature_names))
-        y_sample_proba = self.model.predict_proba(X_sample)[:, 1]
-
-        # Train a simple neural network to approximate XGBoost
-        model = tf.keras.Sequential([
-            tf.keras.layers.Dense(32, activation='relu', input_shape=(len(self.feature_names),)),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.Dense(16, activation='relu'),
-            tf.keras.layers.Dense(1, activation='sigmoid')
-        ])
-
-        model.compile(
-            optimizer='adam',
-            loss='binary_crossentropy',
-            metrics=['accuracy']
-        )
+        booster = self.model.get_booster().copy()
+        booster.set_param({'nthread': n_threads or self.training_config.thread_budget()})
+        forest = CompiledForest.from_booster(booster)
 
-        model.fit(X_sample, y_sample_proba, epochs=50, batch_size=32, verbose=0)
+        # Inputs are standardized, so standard normal samples cover the split thresholds
+        X_check = np.random.default_rng(42).standard_normal((10000, len(self.feature_names))).astype(np.float32)
+        max_diff = validate_compiled(forest, booster, X_check)
+        print(f"Compiled {forest.n_trees} trees (depth {forest.depth}), max abs difference vs XGBoost: {max_diff:.2e}")
 
-        # Save as TensorFlow.js
         tfjs_dir = os.path.join(output_dir, 'tfjs')
-        tfjs.converters.save_keras_model(model, tfjs_dir)
+        forest.save_tfjs(tfjs_dir)
+
+        return {
+            'format': 'graph_model',
+            'n_trees': forest.n_trees,
+            'depth': forest.depth,
+            'max_abs_difference': max_diff,
+        }
 
         print(f"Saved TensorFlow.js model to {tfjs_dir}")
 
-    def run_pipeline(self):
+    def run_pipeline(
+        self,
+        lookback_days: int = 90,
+        use_rollup: bool = False,
+        output_dir: str = './models/churn-predictor',
+        checkpoint_dir: str = './checkpoints/churn-pipeline',
+        resume: bool = True,
+        synthetic_rows: int = None
+    ):
         """
         Run complete training pipeline
+
+        Every stage's outputs are checkpointed under checkpoint_dir, keyed by
+        its parameters and the content of its inputs, so a rerun (e.g. after a
+        failed export) skips completed stages. Data is reloaded at most once
+        per day; pass resume=False to recompute everything. Cross-validation
+        and TF.js export are independent and run concurrently. With
+        synthetic_rows set, generated data replaces the database load.
         """
         print("=== Churn Model Training Pipeline ===\n")
 
+        checkpoints = PipelineCheckpoints(checkpoint_dir, resume=resume)
+
         # Load data
-        df = self.load_data(lookback_days=90)
+        if synthetic_rows:
+            raw = checkpoints.run(
+                'load',
+                lambda work_dir: {'data': self.load_synthetic_data(synthetic_rows)},
+                params={'synthetic_rows': synthetic_rows}
+            )
+        else:
+            raw = checkpoints.run(
+                'load',
+                lambda work_dir: {'data': self.load_data(lookback_days=lookback_days, use_rollup=use_rollup)},
+                params={'lookback_days': lookback_days, 'use_rollup': use_rollup, 'date': datetime.now().date()}
+            )
 
         # Prepare features
-        X, y = self.prepare_features(df)
-
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y,
-            test_size=0.2,
-            random_state=42,
-            stratify=y
-        )
+        def prepare(work_dir):
+            X, y = self.prepare_features(raw['data'])
+            return {'X': X, 'y': y}
+
+        prepared = checkpoints.run('prepare', prepare, params={'features': self.feature_names}, upstream=[raw])
+        X, y = prepared['X'], prepared['y']
+
+        # Split data and standardize with statistics from the training split only
+        def split(work_dir):
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y,
+                test_size=0.2,
+                random_state=42,
+                stratify=y
+            )
+
+            X_train, X_val, y_train, y_val = train_test_split(
+                X_train, y_train,
+                test_size=0.2,
+                random_state=42,
+                stratify=y_train
+            )
+
+            # The splits are fresh copies, so they are scaled in place
+            self.fit_scaler(X_train)
+            self.scale_features(X_val)
+            self.scale_features(X_test)
+
+            return {
+                'X_train': X_train, 'y_train': y_train,
+                'X_val': X_val, 'y_val': y_val,
+                'X_test': X_test, 'y_test': y_test,
+                'scaler': self.scaler,
+            }
 
-        X_train, X_val, y_train, y_val = train_test_split(
-            X_train, y_train,
-            test_size=0.2,
-            random_state=42,
-            stratify=y_train
+        splits = checkpoints.run(
+            'split', split, params={'test_size': 0.2, 'random_state': 42, 'scaler': 'standard'}, upstream=[prepared]
         )
+        self.scaler = splits['scaler']
 
-        print(f"Train set: {len(X_train)} samples")
-        print(f"Validation set: {len(X_val)} samples")
-        print(f"Test set: {len(X_test)} samples\n")
+        print(f"Train set: {len(splits['X_train'])} samples")
+        print(f"Validation set: {len(splits['X_val'])} samples")
+        print(f"Test set: {len(splits['X_test'])} samples\n")
 
-        # Train model
-        self.train(X_train, y_train, X_val, y_val)
+        # Train model; the key covers the resource config and hyperparameters,
+        # so changing either retrains instead of reloading a stale booster
+        xgb_params = self.training_params(splits['y_train'])
+
+        def train(work_dir):
+            self.train(splits['X_train'], splits['y_train'], splits['X_val'], splits['y_val'], params=xgb_params)
+            return {'model': self.model}
+
+        trained = checkpoints.run(
+            'train',
+            train,
+            params={'training_config': self.training_config.to_dict(), 'xgb_params': xgb_params},
+            upstream=[splits]
+        )
+        self.model = trained['model']
 
         # Evaluate on test set
-        metrics = self.evaluate(X_test, y_test)
+        def evaluate(work_dir):
+            self.evaluate(splits['X_test'], splits['y_test'])
+            return {'metadata': self.model_metadata}
+
+        evaluated = checkpoints.run('evaluate', evaluate, upstream=[trained, splits])
+        self.model_metadata = dict(evaluated['metadata'])
+        metrics = self.model_metadata['metrics']
+
+        meets_requirements = self.validator.validate_churn_model(metrics)
+
+        # Cross-validation and TF.js export only read the trained model, so they
+        # run concurrently on halves of the thread budget and return their
+        # results instead of writing to model_metadata
+        budget = self.training_config.thread_budget()
+        export_threads = max(1, budget // 2)
+        cv_threads = max(1, budget - export_threads)
+
+        def cross_validate(work_dir):
+            # Trees are invariant to per-feature affine scaling, so CV uses the
+            # unscaled matrix; each fold's bin edges come from its training rows
+            return {'cross_validation': self.cross_validation_summary(X, y, n_threads=cv_threads)}
+
+        def export_tfjs(work_dir):
+            return {
+                'tfjs': os.path.join(work_dir, 'tfjs'),
+                'tfjs_export': self.export_tfjs(work_dir, n_threads=export_threads),
+            }
 
-        # Cross-validation
-        self.cross_validate(X, y)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            cv_future = executor.submit(checkpoints.run, 'cross_validate', cross_validate, {'cv': 5}, [trained, prepared])
+            export_future = (
+                executor.submit(checkpoints.run, 'export_tfjs', export_tfjs, None, [trained])
+                if meets_requirements else None
+            )
+            self.model_metadata['cross_validation'] = cv_future.result()['cross_validation']
+            exported = export_future.result() if export_future is not None else None
 
         # Validate model meets requirements
-        if self.validator.validate_churn_model(metrics):
+        if meets_requirements:
             print("\n✅ Model meets performance requirements!")
 
             # Save model
-            self.save_model()
+            self.model_metadata['tfjs_export'] = exported['tfjs_export']
+            shutil.copytree(exported['tfjs'], os.path.join(output_dir, 'tfjs'), dirs_exist_ok=True)
+            self.save_model(output_dir, convert=False)
 
             print("\n✅ Training pipeline completed successfully!")
         else:
@@ -357,15 +661,36 @@ class ChurnModelTrainer:
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the churn prediction model')
+    parser.add_argument('--lookback-days', type=int, default=90, help='Train on users created in the last N days')
+    parser.add_argument('--use-rollup', action='store_true', help='Derive features from the daily activity rollup')
+    parser.add_argument('--output-dir', type=str, default='./models/churn-predictor')
+    parser.add_argument('--checkpoint-dir', type=str, default='./checkpoints/churn-pipeline')
+    parser.add_argument('--no-resume', action='store_true', help='Recompute every stage, ignoring checkpoints')
+    parser.add_argument('--synthetic-rows', type=int, default=None,
+                        help='Train on N generated rows instead of the database (perf tests)')
+    args = parser.parse_args()
+
     # Load environment variables
     from dotenv import load_dotenv
     load_dotenv()
 
     db_connection_string = os.getenv('DATABASE_URL')
 
+    if not db_connection_string and args.synthetic_rows:
+        # Synthetic runs never query the database
+        db_connection_string = 'sqlite://'
+
     if not db_connection_string:
         print("ERROR: DATABASE_URL environment variable not set")
         sys.exit(1)
 
     trainer = ChurnModelTrainer(db_connection_string)
-    trainer.run_pipeline()
+    trainer.run_pipeline(
+        lookback_days=args.lookback_days,
+        use_rollup=args.use_rollup,
+        output_dir=args.output_dir,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=not args.no_resume,
+        synthetic_rows=args.synthetic_rows
+    )
@@ -4,76 +4,465 @@ Data Pipeline for ML Training
 Handles data extraction, transformation, and loading (ETL)
 """
 
+import io
+import os
+import uuid
+import asyncio
+import time
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine
-from typing import Optional, List, Dict
+from sqlalchemy import bindparam, create_engine, event, inspect, make_url, text
+from sqlalchemy.sql.elements import TextClause
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple, Union
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from QueryCache import QueryCache
+from FeatureStatistics import FeatureStatisticsAccumulator, exact_feature_statistics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# NULL marker for COPY; an unquoted empty CSV field would otherwise mean NULL
+COPY_NULL = '\\N'
+
+# PostgreSQL type OIDs (cursor.description type_code) by stream dtype
+PG_INT32_TYPES = {21, 23}          # int2, int4
+PG_INT64_TYPES = {20}              # int8
+PG_FLOAT_TYPES = {700, 701, 1700}  # float4, float8, numeric
+
+# Catalog queries used when swapping a staging table in for a live one (PostgreSQL)
+DEPENDENT_VIEWS_SQL = """
+SELECT DISTINCT v.oid, v.oid::regclass::text AS name, v.relkind, pg_get_viewdef(v.oid) AS definition
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+WHERE d.refobjid = CAST(:table AS regclass) AND v.oid <> d.refobjid
+"""
+
+TABLE_GRANTS_SQL = """
+SELECT
+  c.oid::regclass::text AS name,
+  a.privilege_type,
+  CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END AS grantee
+FROM pg_class c, aclexplode(c.relacl) a
+WHERE c.oid = ANY(CAST(:oids AS oid[]))
+"""
+
+OWNED_SEQUENCES_SQL = """
+SELECT s.oid::regclass::text AS sequence, quote_ident(a.attname) AS column_name
+FROM pg_depend d
+JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+WHERE d.refobjid = CAST(:table AS regclass) AND d.deptype = 'a'
+"""
+
+# int64 view of NaT in datetime64[ns] arrays
+NAT_VALUE = np.iinfo(np.int64).min
+
 
 class DataPipeline:
     """
     Data pipeline for ML model training
     """
 
-    def __init__(self, db_connection_string: str):
-        self.engine = create_engine(db_connection_string)
+    def __init__(
+        self,
+        db_connection_string: str,
+        cache_dir: Optional[str] = None,
+        cache_ttl_seconds: float = 6 * 3600,
+        cache_max_bytes: int = 5 * 1024 ** 3,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 1800,
+        async_connection_string: Optional[str] = None,
+        slow_query_seconds: float = 5.0
+    ):
+        url = make_url(db_connection_string)
+        engine_kwargs = {'pool_pre_ping': pool_pre_ping, 'pool_recycle': pool_recycle}
+        if url.get_backend_name() != 'sqlite':
+            engine_kwargs.update({'pool_size': pool_size, 'max_overflow': max_overflow})
+
+        self.engine = create_engine(db_connection_string, **engine_kwargs)
+        self.engine_kwargs = engine_kwargs
+
+        # Async engine is created lazily on first async query
+        self.async_connection_string = async_connection_string or self._async_url(url)
+        self.async_engine = None
+
+        # Per-query timing instrumentation
+        self.slow_query_seconds = slow_query_seconds
+        self.query_timings = deque(maxlen=1000)
+        self._instrument(self.engine)
+
+        # Query result cache is opt-in
+        self.cache = QueryCache(cache_dir, cache_ttl_seconds, cache_max_bytes) if cache_dir else None
+
+    @staticmethod
+    def _async_url(url) -> Optional[str]:
+        """Map a sync PostgreSQL URL onto the asyncpg driver"""
+        if url.get_backend_name() != 'postgresql':
+            return None
+        return url.set(drivername='postgresql+asyncpg').render_as_string(hide_password=False)
+
+    def _instrument(self, engine):
+        """
+        Record wall time of every statement executed on the engine
+        """
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+            summary = " ".join(statement.split())[:200]
+            self.query_timings.append({
+                'statement': summary,
+                'seconds': elapsed,
+                'rowcount': cursor.rowcount,
+                'finished_at': time.time()
+            })
+
+            if elapsed >= self.slow_query_seconds:
+                logger.warning(f"Slow query ({elapsed:.2f}s): {summary}")
+
+    def get_query_timings(self) -> pd.DataFrame:
+        """
+        Recorded statement timings, most recent last
+        """
+        return pd.DataFrame(list(self.query_timings), columns=['statement', 'seconds', 'rowcount', 'finished_at'])
 
-    def load_from_query(self, query: str) -> pd.DataFrame:
+    def load_from_query(
+        self,
+        query: Union[str, TextClause],
+        params: Optional[Dict] = None,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
         """
-        Load data from SQL query
+        Load data from SQL query, with optional bound parameters
+
+        query may also be a text() clause (e.g. with expanding IN parameters).
+        Served from the local query cache when enabled and fresh
         """
+        cached = self._cache_get(query, params, use_cache)
+        if cached is not None:
+            return cached
+
         try:
-            df = pd.read_sql(query, self.engine)
+            df = pd.read_sql(text(query) if isinstance(query, str) else query, self.engine, params=params)
             logger.info(f"Loaded {len(df)} rows from database")
-            return df
         except Exception as e:
             logger.error(f"Failed to load data: {e}")
             raise
 
+        self._cache_put(query, params, df, use_cache)
+
+        return df
+
+    def _cache_get(self, query: Union[str, TextClause], params: Optional[Dict], use_cache: bool) -> Optional[pd.DataFrame]:
+        if self.cache is None or not use_cache:
+            return None
+
+        start = time.perf_counter()
+        cached = self.cache.get(str(query), params)
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} rows from query cache in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        return cached
+
+    def _cache_put(self, query: Union[str, TextClause], params: Optional[Dict], df: pd.DataFrame, use_cache: bool):
+        if self.cache is not None and use_cache:
+            self.cache.put(str(query), params, df)
+
+    def invalidate_cache(self, query: Optional[str] = None, params: Optional[Dict] = None):
+        """
+        Drop one cached query result, or the whole cache when no query is given
+        """
+        if self.cache is None:
+            return
+
+        if query is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(query, params)
+
+    def stream_from_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        chunksize: int = 100_000,
+        downcast: bool = True,
+        dtypes: Optional[Dict[str, object]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream query results in chunks through a server-side cursor
+
+        Only one chunk of rows is held in memory at a time. With downcast
+        enabled, numeric columns are cast to compact dtypes fixed for the
+        whole stream, so every chunk and every Parquet shard spilled from it
+        has the same schema. Dtypes come from dtypes, then from the result's
+        column types (PostgreSQL), then from the first chunk. Integers use
+        nullable dtypes, so NULLs in later chunks never break the stream.
+        """
+        total_rows = 0
+        dtypes = dict(dtypes or {})
+
+        with self.engine.connect().execution_options(
+            stream_results=True,
+            max_row_buffer=chunksize
+        ) as conn:
+            result = conn.execute(text(query), params or {})
+            columns = list(result.keys())
+
+            rows = result.fetchmany(chunksize)
+            if downcast:
+                # Server-side cursors only describe their columns after the first fetch
+                for col, dtype in self.result_dtype_map(result.cursor.description).items():
+                    dtypes.setdefault(col, dtype)
+
+            while rows:
+                chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                if downcast:
+                    if total_rows == 0:
+                        for col, dtype in self.downcast_dtype_map(chunk).items():
+                            dtypes.setdefault(col, dtype)
+                    chunk = self.downcast_dtypes(chunk, dtypes)
+                total_rows += len(chunk)
+                yield chunk
+
+                rows = result.fetchmany(chunksize)
+
+        logger.info(f"Streamed {total_rows} rows from database")
+
+    def result_dtype_map(self, description) -> Dict[str, object]:
+        """
+        Compact dtypes from a DB-API cursor description
+
+        Only PostgreSQL reports column types (as type OIDs); non-numeric
+        columns map to None (left as read). Other drivers return an empty
+        map and dtypes are taken from the data instead
+        """
+        if self.engine.dialect.name != 'postgresql' or not description:
+            return {}
+
+        dtypes = {}
+        for column in description:
+            name, type_code = column[0], column[1]
+            if type_code in PG_INT32_TYPES:
+                dtypes[name] = pd.Int32Dtype()
+            elif type_code in PG_INT64_TYPES:
+                dtypes[name] = pd.Int64Dtype()
+            elif type_code in PG_FLOAT_TYPES:
+                dtypes[name] = np.dtype(np.float32)
+            else:
+                dtypes[name] = None
+
+        return dtypes
+
+    @staticmethod
+    def downcast_dtype_map(df: pd.DataFrame) -> Dict[str, object]:
+        """
+        Compact dtypes for a stream, derived from its first chunk
+
+        Floats become float32 and integers nullable Int64, which holds any
+        later chunk's values and NULLs. Columns with only NULLs carry no type,
+        so they are read as float64 (holds later integers or floats exactly)
+        to keep every shard's schema typed; if such a column later turns out
+        to hold text it is left as read.
+        """
+        dtypes = {}
+
+        for col in df.select_dtypes(include=['floating']).columns:
+            dtypes[col] = np.dtype(np.float32)
+
+        for col in df.select_dtypes(include=['integer']).columns:
+            dtypes[col] = pd.Int64Dtype()
+
+        for col in df.columns[df.isna().all()]:
+            dtypes[col] = np.dtype(np.float64)
+
+        return dtypes
+
+    @staticmethod
+    def downcast_dtypes(df: pd.DataFrame, dtypes: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+        """
+        Cast numeric columns to the given dtypes (derived from df when omitted)
+
+        An integer column whose values do not fit its dtype is widened to
+        Int64 (and dtypes updated, so later chunks follow), and a column that
+        cannot be cast at all is left as read, each with a warning, rather
+        than failing partway through a stream
+        """
+        if dtypes is None:
+            dtypes = DataPipeline.downcast_dtype_map(df)
+
+        for col, dtype in list(dtypes.items()):
+            if dtype is None or col not in df.columns:
+                continue
+
+            try:
+                df[col] = DataPipeline._cast_column(df[col], col, dtype, dtypes)
+            except (TypeError, ValueError):
+                logger.warning(f"Column {col} cannot be cast to {dtype}; leaving it as read")
+                dtypes[col] = None
+
+        return df
+
+    @staticmethod
+    def _cast_column(values: pd.Series, col: str, dtype, dtypes: Dict[str, object]) -> pd.Series:
+        if pd.api.types.is_integer_dtype(dtype):
+            values = pd.to_numeric(values)
+            info = np.iinfo(dtype.numpy_dtype if isinstance(dtype, pd.api.extensions.ExtensionDtype) else dtype)
+            if values.notna().any() and (values.min() < info.min or values.max() > info.max):
+                logger.warning(f"Column {col} overflows {dtype}; widening to Int64 for the rest of the stream")
+                dtype = dtypes[col] = pd.Int64Dtype()
+            elif values.isna().any() and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+                dtype = dtypes[col] = pd.Int64Dtype() if info.bits > 32 else pd.Int32Dtype()
+
+        return values.astype(dtype)
+
+    def spill_to_parquet(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        output_dir: str,
+        prefix: str = 'part'
+    ) -> List[str]:
+        """
+        Write each chunk to its own Parquet shard and return the shard paths
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+
+        for i, chunk in enumerate(chunks):
+            path = os.path.join(output_dir, f"{prefix}-{i:05d}.parquet")
+            chunk.to_parquet(path, index=False)
+            paths.append(path)
+
+        logger.info(f"Spilled {len(paths)} Parquet shards to {output_dir}")
+
+        return paths
+
     def load_user_features(
         self,
         user_ids: Optional[List[str]] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        id_batch_size: int = 5000,
+        max_workers: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Load user features for training
+
+        All values are bound parameters, so the statement text only depends on
+        which filters are present (and the batch size) and the database can
+        reuse its plan. Large user_ids lists are split into batches, each bound
+        as an expanding IN list, and run concurrently over the connection pool.
+        """
+        params = {}
+        if start_date:
+            params['start_date'] = start_date
+        if end_date:
+            params['end_date'] = end_date
+
+        query = self.build_user_features_query(
+            filter_user_ids=bool(user_ids),
+            filter_start_date=bool(start_date),
+            filter_end_date=bool(end_date)
+        )
+
+        if not user_ids:
+            return self.load_from_query(query, params)
+
+        query = text(query).bindparams(bindparam('user_ids', expanding=True))
+
+        batches = [
+            list(user_ids[i:i + id_batch_size])
+            for i in range(0, len(user_ids), id_batch_size)
+        ]
+
+        if len(batches) == 1:
+            return self.load_from_query(query, dict(params, user_ids=batches[0]))
+
+        workers = max_workers or min(len(batches), self._pool_capacity())
+        logger.info(f"Loading features for {len(user_ids)} users in {len(batches)} batches ({workers} concurrent)")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(
+                lambda batch: self.load_from_query(query, dict(params, user_ids=batch)),
+                batches
+            ))
+
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def build_user_features_query(
+        filter_user_ids: bool = False,
+        filter_start_date: bool = False,
+        filter_end_date: bool = False
+    ) -> str:
+        """
+        Build the user features statement
+
+        Each child table is aggregated to one row per user before joining, so
+        the join is 1:1 instead of checkins x goals x sessions per user. The
+        user filters (IDs, signup dates) select the users once, and each
+        aggregate only reads the child rows of those users. :user_ids is an
+        IN list; bind it with bindparam('user_ids', expanding=True).
         """
         where_clauses = []
 
-        if user_ids:
-            user_ids_str = "', '".join(user_ids)
-            where_clauses.append(f"u.id IN ('{user_ids_str}')")
+        if filter_user_ids:
+            where_clauses.append("u.id IN :user_ids")
 
-        if start_date:
-            where_clauses.append(f"u.created_at >= '{start_date}'")
+        if filter_start_date:
+            where_clauses.append("u.created_at >= :start_date")
 
-        if end_date:
-            where_clauses.append(f"u.created_at <= '{end_date}'")
+        if filter_end_date:
+            where_clauses.append("u.created_at <= :end_date")
 
         where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+        child_join = "JOIN selected_users s ON s.id = c.user_id" if where_clauses else ""
 
-        query = f"""
+        return f"""
+        WITH selected_users AS (
+          SELECT u.id, u.created_at, u.subscription_tier
+          FROM users u
+          WHERE {where_sql}
+        )
         SELECT
           u.id as user_id,
           u.created_at as user_created_at,
-          COUNT(DISTINCT hc.id) as total_checkins,
-          COUNT(DISTINCT g.id) as total_goals,
-          COUNT(DISTINCT us.id) as total_sessions,
+          COALESCE(hc.total_checkins, 0) as total_checkins,
+          COALESCE(g.total_goals, 0) as total_goals,
+          COALESCE(us.total_sessions, 0) as total_sessions,
           u.subscription_tier
-        FROM users u
-        LEFT JOIN habit_checkins hc ON u.id = hc.user_id
-        LEFT JOIN goals g ON u.id = g.user_id
-        LEFT JOIN user_sessions us ON u.id = us.user_id
-        WHERE {where_sql}
-        GROUP BY u.id, u.created_at, u.subscription_tier
+        FROM selected_users u
+        LEFT JOIN (
+          SELECT c.user_id, COUNT(*) as total_checkins
+          FROM habit_checkins c {child_join}
+          GROUP BY c.user_id
+        ) hc ON u.id = hc.user_id
+        LEFT JOIN (
+          SELECT c.user_id, COUNT(*) as total_goals
+          FROM goals c {child_join}
+          GROUP BY c.user_id
+        ) g ON u.id = g.user_id
+        LEFT JOIN (
+          SELECT c.user_id, COUNT(*) as total_sessions
+          FROM user_sessions c {child_join}
+          GROUP BY c.user_id
+        ) us ON u.id = us.user_id
         """
 
-        return self.load_from_query(query)
+    def _pool_capacity(self) -> int:
+        """Number of persistent connections in the engine's pool"""
+        pool = self.engine.pool
+        if hasattr(pool, 'size'):
+            return max(1, pool.size())
+        return 1
 
     def handle_missing_values(
         self,
@@ -95,130 +484,691 @@ class DataPipeline:
         else:
             raise ValueError(f"Unknown strategy: {strategy}")
 
+    def compute_outlier_bounds(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        method: str = 'zscore',
+        n_std: float = 3.0,
+        iqr_multiplier: float = 1.5
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Compute per-column (lower, upper) outlier bounds in one vectorized pass
+
+        Methods:
+            zscore: mean +/- n_std * std
+            mad: median +/- n_std * 1.4826 * MAD (robust z-score)
+            iqr: [Q1 - iqr_multiplier * IQR, Q3 + iqr_multiplier * IQR]
+
+        Columns with zero spread (e.g. mostly-zero count features, whose MAD
+        or IQR is 0) get (-inf, inf) bounds instead of collapsing to a point.
+        """
+        columns = [col for col in columns if col in df.columns]
+        values = df[columns].to_numpy(dtype=np.float64)
+
+        if method == 'zscore':
+            center = np.nanmean(values, axis=0)
+            spread = np.nanstd(values, axis=0, ddof=1)
+            lower, upper = center - n_std * spread, center + n_std * spread
+        elif method == 'mad':
+            median = np.nanmedian(values, axis=0)
+            spread = np.nanmedian(np.abs(values - median), axis=0) * 1.4826
+            lower, upper = median - n_std * spread, median + n_std * spread
+        elif method == 'iqr':
+            q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+            spread = q3 - q1
+            lower, upper = q1 - iqr_multiplier * spread, q3 + iqr_multiplier * spread
+        else:
+            raise ValueError(f"Unknown method: {method}")
+
+        # No measurable spread (or no data): leave the column unbounded
+        unbounded = ~(spread > 0)
+        lower = np.where(unbounded, -np.inf, lower)
+        upper = np.where(unbounded, np.inf, upper)
+
+        return {
+            col: (float(lo), float(hi))
+            for col, lo, hi in zip(columns, lower, upper)
+        }
+
+    def outlier_mask(
+        self,
+        df: pd.DataFrame,
+        bounds: Dict[str, Tuple[float, float]]
+    ) -> np.ndarray:
+        """
+        Boolean mask of rows inside all bounds (rows with missing values are excluded)
+        """
+        columns = [col for col in bounds if col in df.columns]
+        if not columns:
+            return np.ones(len(df), dtype=bool)
+
+        values = df[columns].to_numpy(dtype=np.float64)
+        lower = np.array([bounds[col][0] for col in columns])
+        upper = np.array([bounds[col][1] for col in columns])
+
+        return ((values >= lower) & (values <= upper)).all(axis=1)
+
     def remove_outliers(
         self,
         df: pd.DataFrame,
         columns: List[str],
-        n_std: float = 3.0
+        n_std: float = 3.0,
+        method: str = 'zscore',
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None
     ) -> pd.DataFrame:
         """
-        Remove outliers using z-score method
+        Remove outliers with a single boolean mask
+
+        Statistics for all columns are computed once on the input frame, so the
+        result does not depend on column order. Pass precomputed bounds (from
+        compute_outlier_bounds) to filter a chunk of a streamed dataset.
+        """
+        if bounds is None:
+            bounds = self.compute_outlier_bounds(df, columns, method=method, n_std=n_std)
+
+        df_clean = df[self.outlier_mask(df, bounds)]
+
+        logger.info(f"Removed {len(df) - len(df_clean)} outlier rows")
+
+        return df_clean
+
+    def remove_outliers_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        bounds: Dict[str, Tuple[float, float]]
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Filter streamed chunks against precomputed bounds
+        """
+        removed = 0
+
+        for chunk in chunks:
+            mask = self.outlier_mask(chunk, bounds)
+            removed += int((~mask).sum())
+            yield chunk[mask]
+
+        logger.info(f"Removed {removed} outlier rows")
+
+    def balance_indices(
+        self,
+        df: pd.DataFrame,
+        target_column: str,
+        method: str = 'undersample',
+        random_state: int = 42
+    ) -> np.ndarray:
+        """
+        Return row positions of a balanced sample without copying any features
+
+        undersample: every class down to the minority count
+        oversample: every class up to the majority count (with replacement)
+        """
+        if method not in ('undersample', 'oversample'):
+            raise ValueError(f"Unknown method: {method}")
+
+        rng = np.random.default_rng(random_state)
+        labels = df[target_column].to_numpy()
+        classes, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        target_count = counts.min() if method == 'undersample' else counts.max()
+
+        order = np.argsort(inverse, kind='stable')
+        class_positions = np.split(order, np.cumsum(counts)[:-1])
+
+        sampled = []
+        for positions in class_positions:
+            if method == 'undersample':
+                sampled.append(rng.choice(positions, size=target_count, replace=False))
+            else:
+                extra = rng.choice(positions, size=target_count - len(positions), replace=True)
+                sampled.append(np.concatenate([positions, extra]))
+
+        indices = np.sort(np.concatenate(sampled))
+
+        logger.info(f"Balanced index from {len(df)} to {len(indices)} rows ({len(classes)} classes x {target_count})")
+
+        return indices
+
+    def balance_weights(self, df: pd.DataFrame, target_column: str) -> np.ndarray:
+        """
+        Per-row sample weights (n / (n_classes * class_count)) for XGBoost's sample_weight
         """
-        df_clean = df.copy()
+        labels = df[target_column].to_numpy()
+        classes, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        class_weights = len(labels) / (len(classes) * counts)
 
-        for col in columns:
-            if col not in df_clean.columns:
+        return class_weights[inverse].astype(np.float32)
+
+    def smote_samples(
+        self,
+        df: pd.DataFrame,
+        target_column: str,
+        k_neighbors: int = 5,
+        chunk_rows: int = 50_000,
+        n_jobs: int = -1,
+        random_state: int = 42
+    ) -> pd.DataFrame:
+        """
+        Generate only the synthetic SMOTE rows needed to lift each class to the majority count
+
+        Neighbor search runs in chunks of query rows (bounding the distance
+        matrix) and in parallel across n_jobs.
+        """
+        from sklearn.neighbors import NearestNeighbors
+
+        rng = np.random.default_rng(random_state)
+        feature_columns = [col for col in df.columns if col != target_column]
+        labels = df[target_column].to_numpy()
+        classes, counts = np.unique(labels, return_counts=True)
+        majority_count = counts.max()
+
+        synthetic_frames = []
+        for label, count in zip(classes, counts):
+            n_new = majority_count - count
+            if n_new == 0:
                 continue
 
-            mean = df_clean[col].mean()
-            std = df_clean[col].std()
+            X_class = df.loc[labels == label, feature_columns].to_numpy(dtype=np.float32)
+            k = min(k_neighbors, len(X_class) - 1)
+            if k < 1:
+                raise ValueError(f"Class {label} has too few samples for SMOTE")
 
-            lower_bound = mean - n_std * std
-            upper_bound = mean + n_std * std
+            base = rng.integers(0, len(X_class), n_new)
+            neighbor_choice = rng.integers(1, k + 1, n_new)  # column 0 is the point itself
 
-            df_clean = df_clean[
-                (df_clean[col] >= lower_bound) & (df_clean[col] <= upper_bound)
-            ]
+            nn = NearestNeighbors(n_neighbors=k + 1, n_jobs=n_jobs).fit(X_class)
+            synthetic = np.empty((n_new, len(feature_columns)), dtype=np.float32)
 
-        logger.info(f"Removed {len(df) - len(df_clean)} outlier rows")
+            for start in range(0, n_new, chunk_rows):
+                stop = min(start + chunk_rows, n_new)
+                chunk_base = base[start:stop]
+                _, neighbors = nn.kneighbors(X_class[chunk_base])
+                partner = neighbors[np.arange(stop - start), neighbor_choice[start:stop]]
+                gap = rng.random((stop - start, 1), dtype=np.float32)
+                synthetic[start:stop] = X_class[chunk_base] + gap * (X_class[partner] - X_class[chunk_base])
 
-        return df_clean
+            frame = pd.DataFrame(synthetic, columns=feature_columns)
+            frame[target_column] = label
+            synthetic_frames.append(self._cast_like(frame, df.dtypes))
+
+        if not synthetic_frames:
+            return df.iloc[:0]
+
+        return pd.concat(synthetic_frames, ignore_index=True)
+
+    @staticmethod
+    def _cast_like(frame: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+        """Cast interpolated rows back to the source column dtypes, rounding integer and bool columns"""
+        for col in frame.columns:
+            dtype = dtypes[col]
+            values = frame[col]
+            if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+                values = np.rint(values)
+            frame[col] = values.astype(dtype)
+        return frame
 
     def balance_dataset(
         self,
         df: pd.DataFrame,
         target_column: str,
-        method: str = 'undersample'
+        method: str = 'undersample',
+        n_jobs: int = -1
     ) -> pd.DataFrame:
         """
         Balance imbalanced dataset
-        """
-        from imblearn.under_sampling import RandomUnderSampler
-        from imblearn.over_sampling import RandomOverSampler, SMOTE
-
-        X = df.drop(columns=[target_column])
-        y = df[target_column]
 
-        if method == 'undersample':
-            sampler = RandomUnderSampler(random_state=42)
-        elif method == 'oversample':
-            sampler = RandomOverSampler(random_state=42)
+        Resampling selects rows by index, and SMOTE only materializes the new
+        synthetic rows, so the input is never split into separate X/y copies.
+        Every method returns a fresh RangeIndex and the input's column dtypes.
+        For training without any copy, use balance_indices or balance_weights.
+        """
+        if method in ('undersample', 'oversample'):
+            df_balanced = df.iloc[self.balance_indices(df, target_column, method)].reset_index(drop=True)
         elif method == 'smote':
-            sampler = SMOTE(random_state=42)
+            synthetic = self.smote_samples(df, target_column, n_jobs=n_jobs)
+            df_balanced = pd.concat([df, synthetic], ignore_index=True)
         else:
             raise ValueError(f"Unknown method: {method}")
 
-        X_resampled, y_resampled = sampler.fit_resample(X, y)
-
-        df_balanced = pd.concat([X_resampled, y_resampled], axis=1)
-
         logger.info(f"Balanced dataset from {len(df)} to {len(df_balanced)} rows")
         logger.info(f"Class distribution:\n{df_balanced[target_column].value_counts()}")
 
         return df_balanced
 
-    def create_time_based_splits(
+    def compute_time_cut_points(
         self,
         df: pd.DataFrame,
         date_column: str,
         train_ratio: float = 0.7,
         val_ratio: float = 0.15
-    ) -> Dict[str, pd.DataFrame]:
+    ) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """
+        Date cut points (train_end, val_end) at the given ratios, via selection instead of a full sort
+
+        Ratios are taken over the rows with a date; NaT rows are ignored.
+        """
+        dates = self._dated(self._date_values(df, date_column), date_column)
+
+        n = len(dates)
+        k_train = min(int(n * train_ratio), n - 1)
+        k_val = min(int(n * (train_ratio + val_ratio)), n - 1)
+        cuts = np.partition(dates, [k_train, k_val])[[k_train, k_val]]
+
+        return pd.Timestamp(cuts[0]), pd.Timestamp(cuts[1])
+
+    @staticmethod
+    def _date_values(df: pd.DataFrame, date_column: str) -> np.ndarray:
+        return pd.to_datetime(df[date_column]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    @staticmethod
+    def _dated(dates: np.ndarray, date_column: str) -> np.ndarray:
+        """Non-NaT entries of _date_values; raises if there are none to split on"""
+        dated = dates[dates != NAT_VALUE]
+
+        if len(dated) == 0:
+            raise ValueError(f"No rows with a {date_column} to split on ({len(dates)} rows, all NaT or empty)")
+
+        return dated
+
+    def create_time_based_splits(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        train_ratio: float = 0.7,
+        val_ratio: float = 0.15,
+        return_indices: bool = False
+    ) -> Dict[str, Union[pd.DataFrame, np.ndarray]]:
         """
         Create time-based train/val/test splits
+
+        Splits are defined by date cut points (train: < train_end,
+        val: [train_end, val_end), test: >= val_end), so the frame is never
+        sorted and rows sharing a timestamp land in the same split. Rows with
+        a NaT date go to test, as they did when the frame was sorted with NaT
+        last. With return_indices the row positions are returned instead of
+        DataFrames.
         """
-        df_sorted = df.sort_values(date_column)
+        train_end, val_end = self.compute_time_cut_points(df, date_column, train_ratio, val_ratio)
+        dates = self._date_values(df, date_column)
+        train_cut, val_cut = train_end.value, val_end.value
+
+        undated = dates == NAT_VALUE
+        indices = {
+            'train': np.flatnonzero(~undated & (dates < train_cut)),
+            'val': np.flatnonzero((dates >= train_cut) & (dates < val_cut)),
+            'test': np.flatnonzero((dates >= val_cut) | undated)
+        }
+
+        logger.info(f"Train: {len(indices['train'])} rows (< {train_end})")
+        logger.info(f"Val: {len(indices['val'])} rows")
+        logger.info(f"Test: {len(indices['test'])} rows (>= {val_end}, {int(undated.sum())} without a date)")
+
+        if return_indices:
+            return indices
 
-        n = len(df_sorted)
-        train_end = int(n * train_ratio)
-        val_end = int(n * (train_ratio + val_ratio))
+        return {name: df.iloc[positions] for name, positions in indices.items()}
+
+    def walk_forward_splits(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        n_folds: int = 5,
+        mode: str = 'expanding',
+        window_folds: int = 1
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (train_indices, test_indices) for walk-forward backtesting
 
-        splits = {
-            'train': df_sorted.iloc[:train_end],
-            'val': df_sorted.iloc[train_end:val_end],
-            'test': df_sorted.iloc[val_end:]
+        The date range is cut into n_folds + 1 equal-count periods (quantiles
+        computed once). Fold i tests on period i + 1 and trains on all earlier
+        periods ('expanding') or the preceding window_folds periods ('rolling').
+        Rows with a NaT date cannot be placed in time and are left out of
+        every fold.
+        """
+        if mode not in ('expanding', 'rolling'):
+            raise ValueError(f"Unknown mode: {mode}")
+
+        dates = self._date_values(df, date_column)
+        valid_dates = self._dated(dates, date_column)
+        n = len(valid_dates)
+        ks = [min(int(n * i / (n_folds + 1)), n - 1) for i in range(1, n_folds + 1)]
+        boundaries = np.partition(valid_dates, ks)[ks]
+        edges = np.concatenate([[valid_dates.min()], boundaries, [np.iinfo(np.int64).max]])
+
+        for fold in range(n_folds):
+            test_start, test_end = edges[fold + 1], edges[fold + 2]
+            train_start = edges[0] if mode == 'expanding' else edges[max(0, fold + 1 - window_folds)]
+
+            train_idx = np.flatnonzero((dates >= train_start) & (dates < test_start))
+            test_idx = np.flatnonzero((dates >= test_start) & (dates < test_end))
+
+            logger.info(f"Fold {fold}: train {len(train_idx)} rows, test {len(test_idx)} rows")
+
+            yield train_idx, test_idx
+
+    def compute_time_cut_points_sql(
+        self,
+        source_query: str,
+        date_column: str,
+        train_ratio: float = 0.7,
+        val_ratio: float = 0.15,
+        params: Optional[Dict] = None
+    ) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """
+        Compute the cut points inside PostgreSQL without loading rows
+        """
+        query = f"""
+        SELECT
+          percentile_disc(:train_q) WITHIN GROUP (ORDER BY {date_column}) as train_end,
+          percentile_disc(:val_q) WITHIN GROUP (ORDER BY {date_column}) as val_end
+        FROM ({source_query}) source
+        """
+        row = self.load_from_query(
+            query,
+            dict(params or {}, train_q=train_ratio, val_q=train_ratio + val_ratio)
+        ).iloc[0]
+
+        return pd.Timestamp(row['train_end']), pd.Timestamp(row['val_end'])
+
+    def load_time_split(
+        self,
+        source_query: str,
+        date_column: str,
+        split: str,
+        cut_points: Tuple[pd.Timestamp, pd.Timestamp],
+        params: Optional[Dict] = None
+    ) -> pd.DataFrame:
+        """
+        Load one split independently by pushing its date range down as a predicate
+        """
+        predicates = {
+            'train': f"{date_column} < :train_end",
+            'val': f"{date_column} >= :train_end AND {date_column} < :val_end",
+            'test': f"{date_column} >= :val_end"
         }
+        if split not in predicates:
+            raise ValueError(f"Unknown split: {split}")
 
-        logger.info(f"Train: {len(splits['train'])} rows")
-        logger.info(f"Val: {len(splits['val'])} rows")
-        logger.info(f"Test: {len(splits['test'])} rows")
+        train_end, val_end = cut_points
+        query = f"SELECT * FROM ({source_query}) source WHERE {predicates[split]}"
 
-        return splits
+        return self.load_from_query(
+            query,
+            dict(params or {}, train_end=train_end.to_pydatetime(), val_end=val_end.to_pydatetime())
+        )
 
-    def generate_feature_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
+    def generate_feature_statistics(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+    ) -> pd.DataFrame:
         """
         Generate feature statistics for monitoring
-        """
-        stats = df.describe().T
 
-        stats['missing_count'] = df.isnull().sum()
-        stats['missing_percentage'] = (df.isnull().sum() / len(df)) * 100
-        stats['unique_count'] = df.nunique()
-        stats['dtype'] = df.dtypes
+        A DataFrame is already in memory, so its statistics are exact. A stream
+        of chunks (e.g. from stream_from_query) is summarized in a single pass,
+        with approximate distinct counts (HyperLogLog) and quartiles (KLL).
+        Use FeatureStatisticsAccumulator directly to merge results across workers.
+        """
+        if isinstance(data, pd.DataFrame):
+            return exact_feature_statistics(data)
 
-        return stats
+        return FeatureStatisticsAccumulator().consume(data).to_frame()
 
     def save_processed_data(
         self,
         df: pd.DataFrame,
         table_name: str,
-        if_exists: str = 'replace'
+        if_exists: str = 'replace',
+        copy_chunk_rows: int = 500_000
     ):
         """
         Save processed data back to database
+
+        On PostgreSQL rows are bulk loaded with COPY FROM STDIN; other
+        databases fall back to multi-row INSERTs. With if_exists='replace' an
+        existing PostgreSQL table is replaced through a staging table (see
+        _replace_via_staging), so readers are only blocked for the swap.
+        Elsewhere an existing table with the same columns is emptied and
+        reloaded in one transaction, keeping its indexes and dependent views;
+        if the columns changed, it is dropped and recreated instead.
         """
+        if if_exists not in ('replace', 'append', 'fail'):
+            raise ValueError(f"Unknown if_exists: {if_exists}")
+
+        start = time.perf_counter()
+
         try:
-            df.to_sql(
-                table_name,
-                self.engine,
-                if_exists=if_exists,
-                index=False
-            )
-            logger.info(f"Saved {len(df)} rows to {table_name}")
+            if (
+                if_exists == 'replace'
+                and self.engine.dialect.name == 'postgresql'
+                and inspect(self.engine).has_table(table_name)
+            ):
+                self._replace_via_staging(df, table_name, copy_chunk_rows)
+            else:
+                self._save_in_place(df, table_name, if_exists, copy_chunk_rows)
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"Saved {len(df)} rows to {table_name} in {elapsed:.2f}s ({len(df) / max(elapsed, 1e-9):.0f} rows/s)")
         except Exception as e:
             logger.error(f"Failed to save data: {e}")
             raise
 
+    def _save_in_place(self, df: pd.DataFrame, table_name: str, if_exists: str, copy_chunk_rows: int):
+        with self.engine.begin() as conn:
+            exists = inspect(conn).has_table(table_name)
+
+            if exists and if_exists == 'fail':
+                raise ValueError(f"Table {table_name} already exists")
+
+            if exists and if_exists == 'replace':
+                quote = self.engine.dialect.identifier_preparer.quote
+                table_columns = {col['name'] for col in inspect(conn).get_columns(table_name)}
+
+                if table_columns == set(df.columns):
+                    conn.execute(text(f"DELETE FROM {quote(table_name)}"))
+                else:
+                    conn.execute(text(f"DROP TABLE {quote(table_name)}"))
+                    exists = False
+
+            if not exists:
+                df.head(0).to_sql(table_name, conn, index=False)
+
+            self._bulk_insert(conn, df, table_name, copy_chunk_rows)
+
+    def _replace_via_staging(self, df: pd.DataFrame, table_name: str, copy_chunk_rows: int):
+        """
+        Load into a staging table, then swap it in with renames in a short transaction
+
+        The COPY takes no lock on the live table, so readers keep using it until
+        the swap, which only renames tables and recreates catalog objects. When
+        the columns are unchanged the staging table copies the live table's
+        indexes, constraints and defaults (LIKE ... INCLUDING ALL; index names
+        are regenerated). Grants, directly dependent views and serial
+        sequences are carried over to the new table; objects that cannot be
+        (views on those views, foreign keys referencing the table) make the
+        swap fail and roll back, leaving the live table untouched.
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        suffix = uuid.uuid4().hex[:8]
+        staging_name = f"{table_name[:40]}_staging_{suffix}"
+        live, staging, retired = quote(table_name), quote(staging_name), quote(f"{table_name[:40]}_retired_{suffix}")
+
+        try:
+            with self.engine.begin() as conn:
+                table_columns = {col['name'] for col in inspect(conn).get_columns(table_name)}
+                if table_columns == set(df.columns):
+                    conn.execute(text(f"CREATE TABLE {staging} (LIKE {live} INCLUDING ALL)"))
+                else:
+                    df.head(0).to_sql(staging_name, conn, index=False)
+
+                self._bulk_insert(conn, df, staging_name, copy_chunk_rows)
+
+            with self.engine.begin() as conn:
+                conn.execute(text(f"LOCK TABLE {live} IN ACCESS EXCLUSIVE MODE"))
+
+                views = conn.execute(text(DEPENDENT_VIEWS_SQL), {'table': live}).fetchall()
+                sequences = conn.execute(text(OWNED_SEQUENCES_SQL), {'table': live}).fetchall()
+                table_oid = conn.execute(text("SELECT CAST(:table AS regclass)::oid"), {'table': live}).scalar()
+                grants = conn.execute(
+                    text(TABLE_GRANTS_SQL), {'oids': [table_oid] + [view.oid for view in views]}
+                ).fetchall()
+
+                for view in views:
+                    kind = 'MATERIALIZED VIEW' if view.relkind == 'm' else 'VIEW'
+                    conn.execute(text(f"DROP {kind} {view.name}"))
+
+                conn.execute(text(f"ALTER TABLE {live} RENAME TO {retired}"))
+                conn.execute(text(f"ALTER TABLE {staging} RENAME TO {live}"))
+
+                for view in views:
+                    kind = 'MATERIALIZED VIEW' if view.relkind == 'm' else 'VIEW'
+                    conn.execute(text(f"CREATE {kind} {view.name} AS {view.definition}"))
+
+                for grant in grants:
+                    # The table's name was captured before the rename, so it now refers to the new table
+                    conn.execute(text(f"GRANT {grant.privilege_type} ON {grant.name} TO {grant.grantee}"))
+
+                for sequence in sequences:
+                    conn.execute(text(f"ALTER SEQUENCE {sequence.sequence} OWNED BY {live}.{sequence.column_name}"))
+
+                conn.execute(text(f"DROP TABLE {retired}"))
+        except Exception:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+            raise
+
+    def _bulk_insert(self, conn, df: pd.DataFrame, table_name: str, copy_chunk_rows: int):
+        """
+        Append rows using COPY on PostgreSQL, multi-row INSERT elsewhere
+        """
+        if self.engine.dialect.name == 'postgresql':
+            copy_sql = self._copy_sql(table_name, df.columns)
+
+            cursor = conn.connection.cursor()
+            try:
+                for start in range(0, len(df), copy_chunk_rows):
+                    cursor.copy_expert(copy_sql, self._copy_buffer(df.iloc[start:start + copy_chunk_rows]))
+            finally:
+                cursor.close()
+        else:
+            # Keep each INSERT under common bound-parameter limits
+            rows_per_insert = max(1, 30000 // max(1, len(df.columns)))
+            df.to_sql(
+                table_name,
+                conn,
+                if_exists='append',
+                index=False,
+                method='multi',
+                chunksize=rows_per_insert
+            )
+
+    def _copy_sql(self, table_name: str, columns: Iterable[str]) -> str:
+        """
+        COPY statement matching _copy_buffer; the explicit NULL marker keeps
+        empty strings distinct from missing values
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        column_list = ", ".join(quote(col) for col in columns)
+        return f"COPY {quote(table_name)} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+
+    @staticmethod
+    def _copy_buffer(df: pd.DataFrame) -> io.StringIO:
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+        return buffer
+
+    def _get_async_engine(self):
+        if self.async_engine is None:
+            if self.async_connection_string is None:
+                raise ValueError("Async queries need a PostgreSQL URL or async_connection_string")
+
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            self.async_engine = create_async_engine(self.async_connection_string, **self.engine_kwargs)
+            self._instrument(self.async_engine.sync_engine)
+
+        return self.async_engine
+
+    async def load_from_query_async(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
+        """
+        Load data from SQL query over the async engine
+
+        Uses the same query cache as load_from_query
+        """
+        cached = self._cache_get(query, params, use_cache)
+        if cached is not None:
+            return cached
+
+        async with self._get_async_engine().connect() as conn:
+            df = await conn.run_sync(
+                lambda sync_conn: pd.read_sql(text(query), sync_conn, params=params)
+            )
+
+        logger.info(f"Loaded {len(df)} rows from database (async)")
+
+        self._cache_put(query, params, df, use_cache)
+
+        return df
+
+    async def load_many_async(
+        self,
+        queries: Dict[str, Tuple[str, Optional[Dict]]],
+        use_cache: bool = True
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Run independent queries concurrently; queries maps name -> (sql, params)
+        """
+        names = list(queries)
+        frames = await asyncio.gather(*(
+            self.load_from_query_async(sql, params, use_cache) for sql, params in queries.values()
+        ))
+        return dict(zip(names, frames))
+
+    def load_many(
+        self,
+        queries: Dict[str, Tuple[str, Optional[Dict]]],
+        use_cache: bool = True
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Synchronous entry point for load_many_async
+
+        Starts its own event loop, so it cannot be called from code already
+        running in one (FastAPI handlers, notebooks); await load_many_async there.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("load_many cannot run inside an event loop; await load_many_async instead")
+
+        start = time.perf_counter()
+        results = asyncio.run(self._load_many_and_dispose(queries, use_cache))
+        logger.info(f"Loaded {len(queries)} queries concurrently in {time.perf_counter() - start:.2f}s")
+        return results
+
+    async def _load_many_and_dispose(self, queries, use_cache):
+        # asyncio.run closes its loop, so pooled async connections must not outlive it
+        try:
+            return await self.load_many_async(queries, use_cache)
+        finally:
+            if self.async_engine is not None:
+                await self.async_engine.dispose()
+                self.async_engine = None
+
+    async def aclose(self):
+        """
+        Close async engine connections
+        """
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+            self.async_engine = None
+
     def close(self):
         """
         Close database connection
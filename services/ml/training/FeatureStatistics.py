@@ -0,0 +1,330 @@
+"""
+Streaming Feature Statistics
+
+Single-pass, mergeable statistics for datasets that do not fit in memory.
+Each accumulator consumes DataFrame chunks and can be merged with
+accumulators built by other workers.
+
+- Moments: count, mean and M2 (variance) via Chan et al. parallel updates
+- Distinct counts: HyperLogLog
+- Quantiles: KLL sketch (seeded, so the same input gives the same result)
+
+exact_feature_statistics computes the same table exactly for a DataFrame
+that is already in memory.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+STATISTICS_COLUMNS = [
+    'count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max',
+    'missing_count', 'missing_percentage', 'unique_count', 'dtype'
+]
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 64-bit pandas hashes
+
+    Relative standard error is about 1.04 / sqrt(2 ** precision)
+    (1.6% at the default precision of 12).
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values: pd.Series):
+        if len(values) == 0:
+            return
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remaining = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+
+        # Position of the leftmost 1-bit within the remaining (64 - p) bits
+        _, bit_length = np.frexp(remaining.astype(np.float64))
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * self.m and zeros > 0:
+            # Small-range correction (linear counting)
+            return float(self.m * np.log(self.m / zeros))
+
+        return float(raw)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch
+
+    Items live in compactors; an item at level h stands for 2 ** h inputs.
+    When a level overflows it is sorted and every other item (random offset)
+    is promoted, keeping memory at O(k log(n / k)).
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                items = np.sort(items)
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self.rng.integers(2)::2]
+
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return [float('nan')] * len(qs)
+
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items)
+        items, weights = items[order], weights[order]
+        cumulative = np.cumsum(weights) / weights.sum()
+
+        positions = np.searchsorted(cumulative, qs, side='left')
+        return [float(items[min(p, len(items) - 1)]) for p in positions]
+
+
+def is_numeric_series(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def normalize_for_hashing(values: pd.Series) -> pd.Series:
+    """
+    Dtype-independent form of non-null values for distinct counting
+
+    Integers of any width, and floats that hold only integral values (an
+    integer column with nulls), hash as int64; other floats as float64. So
+    the same value hashes the same whether a chunk arrived as int8, int32
+    or float.
+    """
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_integer_dtype(values):
+        return values.astype(np.int64)
+
+    if pd.api.types.is_float_dtype(values):
+        array = values.to_numpy(dtype=np.float64)
+        if np.all(np.mod(array, 1) == 0) and np.all(np.abs(array) < 2.0 ** 63):
+            return pd.Series(array.astype(np.int64))
+        return pd.Series(array)
+
+    return values
+
+
+class ColumnStatistics:
+    """
+    Mergeable per-column accumulator
+
+    A column that has only produced nulls so far (and so arrived with object
+    dtype) is promoted to numeric by the first chunk with numeric values.
+    """
+
+    def __init__(self, dtype, numeric: bool, hll_precision: int = 12, kll_k: int = 200, seed: int = 0):
+        self.dtype = dtype
+        self.numeric = numeric
+        self.rows = 0
+        self.null_count = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.distinct = HyperLogLog(hll_precision)
+        self.quantiles_k = kll_k
+        self.seed = seed
+        self.quantiles = KLLSketch(kll_k, seed) if numeric else None
+
+    def update(self, series: pd.Series):
+        nulls = series.isna()
+        values = series[~nulls]
+
+        self.rows += len(series)
+        self.null_count += int(nulls.sum())
+        self.distinct.update(normalize_for_hashing(values))
+
+        if len(values) == 0:
+            return
+
+        if not self.numeric and self._only_nulls(len(values)) and is_numeric_series(series):
+            self._promote(series.dtype)
+
+        if not self.numeric:
+            return
+
+        array = values.to_numpy(dtype=np.float64)
+        batch_count = len(array)
+        batch_mean = float(array.mean())
+        batch_m2 = float(((array - batch_mean) ** 2).sum())
+
+        self._combine_moments(batch_count, batch_mean, batch_m2)
+        self.min = min(self.min, float(array.min()))
+        self.max = max(self.max, float(array.max()))
+        self.quantiles.update(array)
+
+    def _only_nulls(self, new_values: int = 0) -> bool:
+        """Whether every value seen before the latest new_values was null"""
+        return self.rows - self.null_count == new_values
+
+    def _promote(self, dtype):
+        self.dtype = dtype
+        self.numeric = True
+        self.quantiles = KLLSketch(self.quantiles_k, self.seed)
+
+    def _combine_moments(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def merge(self, other: 'ColumnStatistics'):
+        if other.numeric and not self.numeric and self._only_nulls():
+            self._promote(other.dtype)
+
+        self.rows += other.rows
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+
+        if self.numeric and other.count:
+            self._combine_moments(other.count, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.quantiles.merge(other.quantiles)
+
+    def summary(self) -> Dict:
+        stats = {
+            'count': self.rows - self.null_count,
+            'missing_count': self.null_count,
+            'missing_percentage': self.null_count / self.rows * 100 if self.rows else 0.0,
+            'unique_count': round(self.distinct.estimate()),
+            'dtype': self.dtype,
+        }
+
+        if self.numeric and self.count:
+            q25, q50, q75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+            stats.update({
+                'mean': self.mean,
+                'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan'),
+                'min': self.min,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': self.max,
+            })
+
+        return stats
+
+
+class FeatureStatisticsAccumulator:
+    """
+    Single-pass feature statistics over a stream of DataFrame chunks
+
+    Usage:
+        acc = FeatureStatisticsAccumulator()
+        for chunk in pipeline.stream_from_query(query):
+            acc.update(chunk)
+        acc.merge(other_worker_acc)
+        validator.validate_data_quality(acc.to_dict())
+    """
+
+    def __init__(self, hll_precision: int = 12, kll_k: int = 200, seed: int = 0):
+        self.hll_precision = hll_precision
+        self.kll_k = kll_k
+        self.seed = seed
+        self.columns: Dict[str, ColumnStatistics] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        for name in chunk.columns:
+            series = chunk[name]
+            if name not in self.columns:
+                self.columns[name] = ColumnStatistics(
+                    series.dtype, is_numeric_series(series), self.hll_precision, self.kll_k, self.seed
+                )
+            self.columns[name].update(series)
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> 'FeatureStatisticsAccumulator':
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: 'FeatureStatisticsAccumulator'):
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Per-feature statistics, in the shape ModelValidator.validate_data_quality expects"""
+        return {name: column.summary() for name, column in self.columns.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Statistics as a DataFrame with the same columns as DataFrame.describe().T plus extras"""
+        return pd.DataFrame.from_dict(self.to_dict(), orient='index').reindex(columns=STATISTICS_COLUMNS)
+
+
+def exact_feature_statistics(df: pd.DataFrame) -> pd.DataFrame:
+    """Exact counterpart of FeatureStatisticsAccumulator.to_frame for an in-memory DataFrame"""
+    numeric = [name for name in df.columns if is_numeric_series(df[name])]
+    if numeric:
+        stats = df[numeric].describe().T.reindex(df.columns)
+    else:
+        stats = pd.DataFrame(index=df.columns)
+
+    missing = df.isna().sum()
+    stats['count'] = len(df) - missing
+    stats['missing_count'] = missing
+    stats['missing_percentage'] = missing / len(df) * 100 if len(df) else 0.0
+    stats['unique_count'] = df.nunique()
+    stats['dtype'] = df.dtypes
+
+    return stats.reindex(columns=STATISTICS_COLUMNS)
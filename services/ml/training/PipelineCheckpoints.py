@@ -0,0 +1,222 @@
+"""
+Pipeline Checkpoints
+
+Content-addressed checkpoints for multi-stage training pipelines. A stage's
+key hashes its name, parameters and the digests of its upstream outputs, so
+a rerun with the same inputs loads the stored outputs instead of recomputing
+them, and any upstream change invalidates everything downstream.
+
+Outputs are stored by type:
+    pandas.DataFrame        -> <name>.parquet
+    numpy.ndarray           -> <name>.npy (loaded memory-mapped)
+    XGBoost sklearn model   -> <name>.ubj (hyperparameters kept in the manifest)
+    dict / list             -> <name>.json
+    directory written under the stage's work_dir -> returned as a path
+    anything else           -> <name>.pkl (joblib)
+
+Layout:
+    <root_dir>/<stage>/<key>/manifest.json
+    <root_dir>/<stage>/<key>/<outputs>
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StageResult:
+    """Outputs of one stage run (or checkpoint hit) and their combined digest"""
+
+    def __init__(self, name: str, key: str, digest: str, outputs: Dict[str, Any], cached: bool):
+        self.name = name
+        self.key = key
+        self.digest = digest
+        self.outputs = outputs
+        self.cached = cached
+
+    def __getitem__(self, output_name: str):
+        return self.outputs[output_name]
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _file_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _dir_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            sha.update(os.path.relpath(file_path, path).encode('utf-8'))
+            sha.update(_file_digest(file_path).encode('utf-8'))
+    return sha.hexdigest()
+
+
+class PipelineCheckpoints:
+    """
+    Runs pipeline stages with checkpointing
+
+    Usage:
+        checkpoints = PipelineCheckpoints('./checkpoints/churn')
+        raw = checkpoints.run('load', lambda work_dir: {'data': load()}, params={'days': 90})
+        prep = checkpoints.run('prepare', lambda work_dir: {...}, upstream=[raw])
+    """
+
+    def __init__(self, root_dir: str, resume: bool = True):
+        self.root_dir = root_dir
+        self.resume = resume
+        os.makedirs(root_dir, exist_ok=True)
+
+    @staticmethod
+    def stage_key(name: str, params: Optional[Dict] = None, upstream: Iterable[StageResult] = ()) -> str:
+        payload = json.dumps(
+            {
+                'stage': name,
+                'params': params or {},
+                'upstream': {result.name: result.digest for result in upstream},
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def run(
+        self,
+        name: str,
+        fn: Callable[[str], Dict[str, Any]],
+        params: Optional[Dict] = None,
+        upstream: Iterable[StageResult] = ()
+    ) -> StageResult:
+        """
+        Load the stage's checkpoint if one exists for these inputs, otherwise
+        call fn(work_dir) and checkpoint the dict of outputs it returns
+        """
+        upstream = list(upstream)
+        key = self.stage_key(name, params, upstream)
+        stage_dir = os.path.join(self.root_dir, name, key)
+        manifest_path = os.path.join(stage_dir, 'manifest.json')
+
+        if self.resume and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            logger.info(f"Stage '{name}' loaded from checkpoint {key}")
+            return StageResult(name, key, manifest['digest'], self._load_outputs(stage_dir, manifest), cached=True)
+
+        os.makedirs(os.path.dirname(stage_dir), exist_ok=True)
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(stage_dir), prefix=f".{key}-")
+
+        try:
+            outputs = fn(work_dir)
+            manifest = self._save_outputs(work_dir, outputs)
+            manifest.update({'stage': name, 'key': key, 'params': params or {}})
+
+            with open(os.path.join(work_dir, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f, indent=2, default=_json_default)
+
+            if os.path.exists(stage_dir):
+                shutil.rmtree(stage_dir)
+            os.replace(work_dir, stage_dir)
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Stage '{name}' completed and checkpointed as {key}")
+        return StageResult(name, key, manifest['digest'], self._load_outputs(stage_dir, manifest), cached=False)
+
+    def _save_outputs(self, work_dir: str, outputs: Dict[str, Any]) -> Dict:
+        entries = {}
+
+        for output_name, value in outputs.items():
+            if isinstance(value, str) and os.path.isdir(value) and \
+                    os.path.commonpath([os.path.abspath(value), os.path.abspath(work_dir)]) == os.path.abspath(work_dir):
+                entry = {'kind': 'directory', 'file': os.path.relpath(value, work_dir)}
+                entry['sha256'] = _dir_digest(value)
+                entries[output_name] = entry
+                continue
+
+            if hasattr(value, 'to_parquet'):
+                entry = {'kind': 'parquet', 'file': f"{output_name}.parquet"}
+                value.to_parquet(os.path.join(work_dir, entry['file']), index=False)
+            elif isinstance(value, np.ndarray):
+                entry = {'kind': 'npy', 'file': f"{output_name}.npy"}
+                np.save(os.path.join(work_dir, entry['file']), value)
+            elif hasattr(value, 'get_booster'):
+                # The booster file does not carry the wrapper's hyperparameters
+                # (n_estimators, early_stopping_rounds, ...), so store them too
+                entry = {
+                    'kind': 'xgboost',
+                    'file': f"{output_name}.ubj",
+                    'class': type(value).__name__,
+                    'params': value.get_params(),
+                }
+                value.save_model(os.path.join(work_dir, entry['file']))
+            elif isinstance(value, (dict, list)):
+                entry = {'kind': 'json', 'file': f"{output_name}.json"}
+                with open(os.path.join(work_dir, entry['file']), 'w') as f:
+                    json.dump(value, f, indent=2, default=_json_default)
+            else:
+                import joblib
+                entry = {'kind': 'pickle', 'file': f"{output_name}.pkl"}
+                joblib.dump(value, os.path.join(work_dir, entry['file']))
+
+            entry['sha256'] = _file_digest(os.path.join(work_dir, entry['file']))
+            entries[output_name] = entry
+
+        digest = hashlib.sha256(
+            json.dumps({k: v['sha256'] for k, v in entries.items()}, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+        return {'outputs': entries, 'digest': digest}
+
+    @staticmethod
+    def _load_outputs(stage_dir: str, manifest: Dict) -> Dict[str, Any]:
+        outputs = {}
+
+        for output_name, entry in manifest['outputs'].items():
+            path = os.path.join(stage_dir, entry['file'])
+            kind = entry['kind']
+
+            if kind == 'parquet':
+                import pandas as pd
+                outputs[output_name] = pd.read_parquet(path)
+            elif kind == 'npy':
+                outputs[output_name] = np.load(path, mmap_mode='r')
+            elif kind == 'xgboost':
+                import xgboost as xgb
+                params = entry.get('params', {})
+                model = getattr(xgb, entry['class'])(**params)
+                model.load_model(path)
+                # load_model copies fitted values such as base_score into the
+                # wrapper; restore the parameters the model was built with
+                model.set_params(**params)
+                outputs[output_name] = model
+            elif kind == 'json':
+                with open(path) as f:
+                    outputs[output_name] = json.load(f)
+            elif kind == 'directory':
+                outputs[output_name] = path
+            else:
+                import joblib
+                outputs[output_name] = joblib.load(path)
+
+        return outputs
@@ -0,0 +1,167 @@
+"""
+Query Result Cache
+
+Opt-in on-disk cache for DataPipeline query results, stored as
+uncompressed Feather files so hits skip decompression (the DataFrame
+returned is still a copy of the file's columns)
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional
+
+import pandas as pd
+import pyarrow.feather as feather
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Quoted literals / identifiers (kept verbatim), or runs of whitespace and line comments
+SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|((?:\s|--[^\n]*)+)""")
+
+
+class QueryCache:
+    """
+    Caches query results keyed by normalized SQL + parameters
+
+    Entries older than ttl_seconds are treated as misses. When the cache
+    grows past max_bytes, least recently read entries are evicted first.
+    Entries may be removed by another thread or process at any time, so a
+    file that disappears mid-operation is treated as a miss.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: float = 6 * 3600,
+        max_bytes: int = 5 * 1024 ** 3
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_sql(query: str) -> str:
+        """
+        Strip SQL line comments and collapse whitespace so formatting does not
+        change the key; quoted literals and identifiers are left untouched
+        """
+        return SQL_TOKENS.sub(lambda match: match.group(1) or ' ', query).strip()
+
+    def key(self, query: str, params: Optional[Dict] = None) -> str:
+        payload = json.dumps(
+            {'sql': self.normalize_sql(query), 'params': params or {}},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.feather")
+
+    def get(self, query: str, params: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """Return the cached result, or None if missing or stale"""
+        path = self._path(self.key(query, params))
+
+        try:
+            stat = os.stat(path)
+
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                os.remove(path)
+                return None
+
+            df = feather.read_table(path).to_pandas()
+
+            # Record the read in atime for LRU eviction, keeping mtime as the write time
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+
+        return df
+
+    def put(self, query: str, params: Optional[Dict], df: pd.DataFrame) -> bool:
+        """
+        Store a result and evict old entries if over the size budget
+
+        Best effort: a result that cannot be written (unsupported column
+        types, full disk) is logged and skipped, since the query itself has
+        already succeeded. Returns whether the result was cached.
+        """
+        path = self._path(self.key(query, params))
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+            os.close(fd)
+            try:
+                feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            self.evict()
+        except Exception as e:
+            logger.warning(f"Could not cache query result: {e}")
+            return False
+
+        return True
+
+    def invalidate(self, query: str, params: Optional[Dict] = None) -> bool:
+        """Remove one cached result; returns whether it existed"""
+        try:
+            os.remove(self._path(self.key(query, params)))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self) -> int:
+        """Remove every cached result; returns the number of entries removed"""
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.feather'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+
+        logger.info(f"Cleared {removed} cached query results")
+        return removed
+
+    def evict(self) -> int:
+        """Delete least recently read entries until the cache fits in max_bytes"""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.feather'):
+                path = os.path.join(self.cache_dir, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        if removed:
+            logger.info(f"Evicted {removed} cached query results")
+
+        return removed
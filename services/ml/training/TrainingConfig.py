@@ -0,0 +1,158 @@
+"""
+Training Configuration
+
+Shared XGBoost resource settings for the churn trainers: tree method,
+histogram bin count and a thread budget, so jobs sharing a machine do not
+each grab every core. Also measures wall time and peak memory of training.
+
+Environment overrides (for scheduled jobs):
+    ML_TREE_METHOD       hist (default), approx or exact
+    ML_MAX_BIN           histogram bins per feature (default 256)
+    ML_TRAINING_THREADS  thread budget (default: available CPUs minus the reserve)
+    ML_RESERVE_THREADS   CPUs left free when ML_TRAINING_THREADS is unset
+                         (default: 10% of available CPUs, at least 1)
+"""
+
+import os
+import time
+import resource
+import threading
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects taskset/cgroup affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_reserve_threads() -> int:
+    """CPUs left free for co-located jobs: 10% of available CPUs, at least 1"""
+    return max(1, available_cpus() // 10)
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+class TrainingConfig:
+    """
+    XGBoost training resources
+
+    Args:
+        tree_method: XGBoost tree method ('hist' unless comparing methods)
+        max_bin: Histogram bins per feature for hist/approx
+        n_threads: Thread budget; defaults to available CPUs minus reserve_threads
+        reserve_threads: CPUs left free for co-located jobs when n_threads is unset
+            (default_reserve_threads() when None; the budget never drops below 1)
+    """
+
+    def __init__(
+        self,
+        tree_method: str = 'hist',
+        max_bin: int = 256,
+        n_threads: Optional[int] = None,
+        reserve_threads: Optional[int] = None
+    ):
+        self.tree_method = tree_method
+        self.max_bin = max_bin
+        self.n_threads = n_threads
+        self.reserve_threads = reserve_threads
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'TrainingConfig':
+        config = {
+            'tree_method': os.getenv('ML_TREE_METHOD', 'hist'),
+            'max_bin': int(os.getenv('ML_MAX_BIN', 256)),
+            'n_threads': int(os.getenv('ML_TRAINING_THREADS')) if os.getenv('ML_TRAINING_THREADS') else None,
+            'reserve_threads': int(os.getenv('ML_RESERVE_THREADS')) if os.getenv('ML_RESERVE_THREADS') else None,
+        }
+        config.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**config)
+
+    def thread_budget(self) -> int:
+        if self.n_threads:
+            return self.n_threads
+        reserve = default_reserve_threads() if self.reserve_threads is None else self.reserve_threads
+        return max(1, available_cpus() - reserve)
+
+    def xgb_params(self) -> Dict:
+        """Parameters to merge into XGBClassifier / xgb.train params"""
+        params = {'tree_method': self.tree_method, 'n_jobs': self.thread_budget()}
+        if self.tree_method in ('hist', 'approx'):
+            params['max_bin'] = self.max_bin
+        return params
+
+    def to_dict(self) -> Dict:
+        return {
+            'tree_method': self.tree_method,
+            'max_bin': self.max_bin,
+            'n_threads': self.thread_budget(),
+        }
+
+
+class ResourceMonitor:
+    """
+    Wall time and peak resident memory of a block
+
+    RSS is sampled from a background thread, so native allocations made by
+    XGBoost are included (tracemalloc would only see Python objects).
+
+    Usage:
+        with ResourceMonitor() as monitor:
+            model.fit(X, y)
+        metadata['resources'] = monitor.to_dict()
+    """
+
+    def __init__(self, interval_seconds: float = 0.05):
+        self.interval_seconds = interval_seconds
+        self.wall_seconds = 0.0
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval_seconds):
+            rss = current_rss_bytes()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def __enter__(self) -> 'ResourceMonitor':
+        self.start_rss = current_rss_bytes()
+        self.peak_rss = self.start_rss
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.wall_seconds = time.perf_counter() - self._start
+
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        return False
+
+    def to_dict(self) -> Dict:
+        stats = {'training_seconds': self.wall_seconds}
+
+        if self.peak_rss is not None:
+            stats['peak_rss_mb'] = self.peak_rss / 1024 ** 2
+            stats['peak_rss_increase_mb'] = (self.peak_rss - self.start_rss) / 1024 ** 2
+        else:
+            # ru_maxrss is in KiB on Linux (process-lifetime peak)
+            stats['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        return stats
@@ -20,17 +20,119 @@ import xgboost as xgb
 import json
 import os
 
+from TrainingConfig import TrainingConfig, ResourceMonitor
+from SyntheticChurnData import generate_dataset
+
+
+# Derived features, shared by training (engineer_features) and batch scoring
+# (ChurnBatchScorer) and evaluated together over one float32 block.
+# (name, numerator, denominator) -> numerator / (denominator + 1); a None numerator means 1
+RATIO_FEATURES = [
+    # Interaction features
+    ('goals_per_day', 'total_goals', 'days_since_signup'),
+    ('checkins_per_habit', 'total_checkins', 'total_habits'),
+    ('session_duration_per_login', 'total_session_duration_minutes', 'login_count'),
+    ('goal_completion_rate', 'completed_goals', 'total_goals'),
+    ('habit_engagement', 'avg_streak', 'total_habits'),
+
+    # Recency features
+    ('login_recency_score', None, 'days_since_last_login'),
+]
+
+# (name, column, threshold) -> 1 where column < threshold, else 0
+THRESHOLD_FEATURES = [
+    ('is_new_user', 'days_since_signup', 30),
+]
+
+DERIVED_FEATURES = [name for name, _, _ in RATIO_FEATURES + THRESHOLD_FEATURES]
+
+
+def derived_feature_block(df: pd.DataFrame, block_rows: int = 65536) -> np.ndarray:
+    """
+    Evaluate DERIVED_FEATURES as one (n_rows, n_derived) float32 block
+
+    Rows are processed in cache-sized blocks: each block's ratio numerators
+    and denominators are gathered side by side and divided with in-place
+    ufuncs, so the only temporary is one small reusable scratch buffer.
+    """
+    n_rows, n_ratios = len(df), len(RATIO_FEATURES)
+
+    numerator_columns = [
+        None if numerator is None else df[numerator].to_numpy() for _, numerator, _ in RATIO_FEATURES
+    ]
+    denominator_columns = [df[denominator].to_numpy() for _, _, denominator in RATIO_FEATURES]
+    threshold_columns = [(df[column].to_numpy(), threshold) for _, column, threshold in THRESHOLD_FEATURES]
+
+    block = np.empty((n_rows, len(DERIVED_FEATURES)), dtype=np.float32, order='F')
+    scratch = np.empty((min(block_rows, n_rows), n_ratios), dtype=np.float32, order='F')
+
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        numerators = block[start:stop, :n_ratios]
+        denominators = scratch[:stop - start]
+
+        for j in range(n_ratios):
+            numerators[:, j] = 1.0 if numerator_columns[j] is None else numerator_columns[j][start:stop]
+            denominators[:, j] = denominator_columns[j][start:stop]
+
+        np.add(denominators, 1.0, out=denominators)
+        np.divide(numerators, denominators, out=numerators)
+
+        for j, (values, threshold) in enumerate(threshold_columns, start=n_ratios):
+            np.less(values[start:stop], threshold, out=block[start:stop, j])
+
+    return block
+
+
+def add_derived_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the derived model features to a frame of raw user_stats columns
+    """
+    # Each assignment copies its column out of the float32 block; the
+    # threshold flags keep their integer dtype
+    block = derived_feature_block(df)
+    n_ratios = len(RATIO_FEATURES)
+
+    for j, name in enumerate(DERIVED_FEATURES):
+        df[name] = block[:, j] if j < n_ratios else block[:, j].astype(int)
+    return df
+
+
+def feature_matrix(df: pd.DataFrame, feature_names: list) -> np.ndarray:
+    """
+    float32 model input in feature_names order, built without adding the
+    derived columns to df (batch scoring path)
+    """
+    derived = dict(zip(DERIVED_FEATURES, derived_feature_block(df).T))
+
+    X = np.empty((len(df), len(feature_names)), dtype=np.float32)
+    for j, name in enumerate(feature_names):
+        X[:, j] = derived[name] if name in derived else df[name].to_numpy()
+
+    return X
+
+
 class ChurnModelTrainer:
-    def __init__(self, db_connection_string: str, model_output_dir: str = './models'):
+    def __init__(
+        self,
+        db_connection_string: str,
+        model_output_dir: str = './models',
+        training_config: TrainingConfig = None
+    ):
         self.db_conn = db_connection_string
         self.model_output_dir = model_output_dir
+        self.training_config = training_config or TrainingConfig.from_env()
         self.model = None
         self.feature_names = []
+        self.training_resources = {}
 
-    def extract_features(self) -> pd.DataFrame:
+    def extract_features(self, n_samples: int = 10000) -> pd.DataFrame:
         """
         Extract features from database
 
+        Args:
+            n_samples: Number of synthetic users to generate (mock mode)
+
         Returns:
             DataFrame with features and target variable
         """
@@ -101,34 +203,8 @@ class ChurnModelTrainer:
         print("Extracting features from database...")
 
         # In production: df = pd.read_sql(query, self.db_conn)
-        # Generate mock data
-        np.random.seed(42)
-        n_samples = 10000
-
-        df = pd.DataFrame({
-            'user_id': [f'user_{i}' for i in range(n_samples)],
-            'days_since_signup': np.random.exponential(90, n_samples),
-            'days_since_last_login': np.random.exponential(10, n_samples),
-            'login_count': np.random.poisson(50, n_samples),
-            'total_session_duration_minutes': np.random.exponential(500, n_samples),
-            'total_goals': np.random.poisson(3, n_samples),
-            'active_goals': np.random.poisson(2, n_samples),
-            'completed_goals': np.random.poisson(1, n_samples),
-            'avg_goal_progress': np.random.uniform(0, 100, n_samples),
-            'total_habits': np.random.poisson(5, n_samples),
-            'active_habits': np.random.poisson(3, n_samples),
-            'total_checkins': np.random.poisson(100, n_samples),
-            'avg_streak': np.random.exponential(10, n_samples),
-            'longest_streak': np.random.exponential(20, n_samples),
-            'engagement_score': np.random.uniform(20, 90, n_samples),
-            'current_churn_risk': np.random.uniform(0, 1, n_samples),
-        })
-
-        # Create target based on heuristics
-        df['churned'] = (
-            (df['days_since_last_login'] > 30) |
-            ((df['engagement_score'] < 30) & (df['active_goals'] == 0))
-        ).astype(int)
+        # Generate synthetic data with correlated features and a realistic churn rate
+        df = generate_dataset(n_samples, schema='profile', seed=42)
 
         print(f"Extracted {len(df)} samples")
         print(f"Churn rate: {df['churned'].mean():.2%}")
@@ -141,16 +217,7 @@ class ChurnModelTrainer:
         """
         print("Engineering features...")
 
-        # Interaction features
-        df['goals_per_day'] = df['total_goals'] / (df['days_since_signup'] + 1)
-        df['checkins_per_habit'] = df['total_checkins'] / (df['total_habits'] + 1)
-        df['session_duration_per_login'] = df['total_session_duration_minutes'] / (df['login_count'] + 1)
-        df['goal_completion_rate'] = df['completed_goals'] / (df['total_goals'] + 1)
-        df['habit_engagement'] = df['avg_streak'] / (df['total_habits'] + 1)
-
-        # Recency features
-        df['login_recency_score'] = 1 / (df['days_since_last_login'] + 1)
-        df['is_new_user'] = (df['days_since_signup'] < 30).astype(int)
+        df = add_derived_features(df)
 
         print(f"Total features: {len(df.columns) - 2}")  # Exclude user_id and churned
 
@@ -182,13 +249,21 @@ class ChurnModelTrainer:
             n_estimators=100,
             objective='binary:logistic',
             eval_metric='auc',
-            random_state=42
+            random_state=42,
+            **self.training_config.xgb_params()
         )
 
-        self.model.fit(
-            X_train, y_train,
-            eval_set=[(X_test, y_test)],
-            verbose=False
+        with ResourceMonitor() as monitor:
+            self.model.fit(
+                X_train, y_train,
+                eval_set=[(X_test, y_test)],
+                verbose=False
+            )
+
+        self.training_resources = monitor.to_dict()
+        print(
+            f"Trained in {self.training_resources['training_seconds']:.1f}s "
+            f"with {self.training_config.to_dict()}"
         )
 
         # Evaluate
@@ -243,6 +318,8 @@ class ChurnModelTrainer:
             'feature_importance': feature_importance.to_dict('records')[:20],
             'model_type': 'XGBClassifier',
             'model_params': self.model.get_params(),
+            'training_config': self.training_config.to_dict(),
+            'training_resources': self.training_resources,
         }
 
         with open(metadata_path, 'w') as f:
@@ -260,12 +337,13 @@ def main():
     # Configuration
     DB_CONN = os.getenv('DATABASE_URL', 'postgresql://localhost/upcoach')
     MODEL_DIR = os.getenv('MODEL_OUTPUT_DIR', './models')
+    N_SAMPLES = int(os.getenv('CHURN_MOCK_SAMPLES', 10000))
 
     # Initialize trainer
     trainer = ChurnModelTrainer(DB_CONN, MODEL_DIR)
 
     # Extract data
-    df = trainer.extract_features()
+    df = trainer.extract_features(N_SAMPLES)
 
     # Engineer features
     df = trainer.engineer_features(df)